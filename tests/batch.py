@@ -0,0 +1,245 @@
+"""
+Пакетный режим для упражнений с input(): много тестов за один запуск интерпретатора.
+
+    python -m tests.batch Секунды cases.txt                  # ответы эталона
+    python -m tests.batch Грибы < cases.txt                  # тесты из stdin
+    python -m tests.batch Секунды cases.txt --check "2. Операции деления/Задания/Секунды.py"
+
+Файл тестов — входные значения подряд, как их по одному читает input() (по одному на строку
+или через пробел): тест за тестом, у каждого упражнения свое число значений (см. EXERCISES).
+Входные данные читаются блоками по BLOCK_BYTES, каждый блок решается эталоном на массивах
+NumPy целиком и записывается одним вызовом write, поэтому миллион тестов — секунды.
+
+--check выполняет скрипт ученика в этом же процессе по разу на тест: input() и print()
+подменяются, вывод сравнивается с эталоном построчно (без пробелов в конце строк).
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+from tests.numeric import digit_sums
+
+# Сколько байт входных данных читается за раз (границы блоков — по строкам)
+BLOCK_BYTES = 1 << 22
+# Сколько расхождений печатает --check
+SHOW_MISMATCHES = 10
+# Больше стольких месяцев баланс вклада не расписывается (строк вывода на один тест)
+BANK_MAX_MONTHS = 10 ** 6
+
+
+def seconds(cases):
+    """Секунды -> "ч:м:с" без ведущих нулей, как в "Секунды.py"."""
+    h, rest = np.divmod(cases[:, 0], 3600)
+    m, s = np.divmod(rest, 60)
+    return ['%d:%d:%d' % row for row in zip(h.tolist(), m.tolist(), s.tolist())]
+
+
+def digit_sum(cases):
+    """Сумма цифр числа (любой длины в пределах int64)."""
+    return [str(total) for total in digit_sums(cases[:, 0]).tolist()]
+
+
+def quadrant(cases):
+    """Номер координатной четверти точки (x, y) или "на оси"."""
+    x, y = cases[:, 0], cases[:, 1]
+    names = np.array(['на оси', 'I', 'II', 'III', 'IV'])
+    index = np.select([(x > 0) & (y > 0), (x < 0) & (y > 0), (x < 0) & (y < 0), (x > 0) & (y < 0)],
+                      [1, 2, 3, 4], default=0)
+    return names[index].tolist()
+
+
+def triangle_type(cases):
+    """Тип треугольника по сторонам: сравнение суммы квадратов катетов с квадратом большей стороны."""
+    sides = np.sort(cases[:, :3], axis=1)
+    k1, k2, h = sides[:, 0], sides[:, 1], sides[:, 2]
+    legs, hyp = k1 * k1 + k2 * k2, h * h
+    names = np.array(['Не существует', 'Прямоугольный', 'Остроугольный', 'Тупоугольный'])
+    index = np.select([k1 + k2 <= h, legs == hyp, legs > hyp], [0, 1, 2], default=3)
+    return names[index].tolist()
+
+
+def mushrooms(cases):
+    """Слово "гриб" с окончанием для числа n."""
+    n = cases[:, 0]
+    last, last_two = n % 10, n % 100
+    teen = (last_two >= 11) & (last_two <= 14)
+    names = np.array(['грибов', 'гриб', 'гриба'])
+    index = np.select([(last == 1) & ~teen, (last >= 2) & (last <= 4) & ~teen], [1, 2], default=0)
+    return names[index].tolist()
+
+
+def bank_deposit(cases):
+    """
+    Баланс вклада по месяцам, пока он меньше целевой суммы. Порядок ввода — как в тестовых
+    значениях задания: начальная сумма, процент годовых, целевая сумма; за месяц вклад
+    растет на процент / 12. Число месяцев считается сразу логарифмом, а не циклом по месяцам.
+    Тесты, на которых цикл не закончился бы (сумма не растет к цели) или длился бы больше
+    BANK_MAX_MONTHS месяцев, получают строку "Ошибка: ..." — остальные тесты считаются как обычно.
+    """
+    start, percent, target = cases[:, 0], cases[:, 1], cases[:, 2]
+    rate = 1 + percent / 1200
+    runs = start < target  # цикл выполняется хотя бы раз
+    errors = np.select([~np.isfinite(cases).all(axis=1), runs & (start <= 0), runs & (rate <= 1)],
+                       ['Ошибка: значения должны быть конечными числами',
+                        'Ошибка: начальная сумма должна быть положительной',
+                        'Ошибка: при неположительном проценте сумма не достигнет цели'], default='')
+    valid = runs & (errors == '')
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        estimate = np.where(valid, np.ceil(np.log(target / start) / np.log(rate)), 0)
+    too_long = valid & ~(estimate <= BANK_MAX_MONTHS)  # в том числе nan и inf
+    errors = np.where(too_long, f'Ошибка: больше {BANK_MAX_MONTHS} месяцев', errors)
+    valid &= ~too_long
+    months = np.where(valid, estimate, 0).astype(np.int64)
+    # Логарифм может ошибиться на месяц из-за округления — поправляем по самим суммам
+    with np.errstate(invalid='ignore', over='ignore'):
+        months += valid & (start * rate ** months < target)
+        months -= (months > 0) & (start * rate ** np.maximum(months - 1, 0) >= target)
+
+    case_index = np.repeat(np.arange(len(cases)), months)
+    month = np.arange(len(case_index)) - np.repeat(np.cumsum(months) - months, months) + 1
+    balances = start[case_index] * rate[case_index] ** month
+    lines = ['%d - %.2f' % row for row in zip(month.tolist(), balances.tolist())]
+    bounds = np.cumsum(months).tolist()
+    return [error or '\n'.join(lines[end - k:end])
+            for end, k, error in zip(bounds, months.tolist(), errors.tolist())]
+
+
+def _side(cases, i, j):
+    return np.sqrt((cases[:, 2 * j] - cases[:, 2 * i]) ** 2 + (cases[:, 2 * j + 1] - cases[:, 2 * i + 1]) ** 2)
+
+
+def distance(cases):
+    """Расстояние между точками (x1, y1) и (x2, y2) в формате "Задание 8.py"."""
+    return ['Расстояние между точками = %r' % d for d in _side(cases, 0, 1).tolist()]
+
+
+def heron_area(cases):
+    """
+    Площадь треугольника по вершинам формулой Герона, в формате "Задание 10.py".
+    Для вырожденных треугольников подкоренное выражение бывает отрицательным — тогда nan.
+    """
+    a, b, c = _side(cases, 0, 1), _side(cases, 1, 2), _side(cases, 0, 2)
+    p = (a + b + c) / 2
+    with np.errstate(invalid='ignore'):
+        area = np.sqrt(p * (p - a) * (p - b) * (p - c))
+    return ['Площадь= %r' % s for s in area.tolist()]
+
+
+# Упражнение -> (число входных значений на тест, тип значений, эталон)
+EXERCISES = {
+    'Секунды': (1, int, seconds),
+    'Сумма цифр числа': (1, int, digit_sum),
+    'Координатная плоскость': (2, int, quadrant),
+    'Тип треугольника': (3, int, triangle_type),
+    'Грибы': (1, int, mushrooms),
+    'Банковский вклад': (3, float, bank_deposit),
+    'Расстояние между точками': (4, int, distance),
+    'Площадь треугольника': (6, int, heron_area),
+}
+
+
+def iter_blocks(stream, width, value_type=int, block_bytes=BLOCK_BYTES):
+    """
+    Генератор блоков тестов из потока: (значения строками, массив тесты x width).
+    Значения, не добравшие до целого теста, переносятся в следующий блок.
+    """
+    dtype = np.int64 if value_type is int else np.float64
+    carry = []
+    while True:
+        lines = stream.readlines(block_bytes)
+        tokens = carry + ''.join(lines).split()
+        if not lines:
+            if tokens:
+                raise ValueError(f"Последний тест неполный: {len(tokens)} значений из {width}")
+            return
+        whole = len(tokens) // width * width
+        tokens, carry = tokens[:whole], tokens[whole:]
+        if tokens:
+            values = np.fromiter(map(value_type, tokens), dtype=dtype, count=whole)
+            yield tokens, values.reshape(-1, width)
+
+
+def solve(name, stream, out):
+    """Ответы эталона для всех тестов из stream; каждый блок пишется в out одним write."""
+    width, value_type, reference = EXERCISES[name]
+    count = 0
+    for _, cases in iter_blocks(stream, width, value_type):
+        out.write(''.join(text + '\n' for text in reference(cases) if text))
+        count += len(cases)
+    return count
+
+
+def run_script(code, path, inputs):
+    """Выполняет скомпилированный скрипт с подмененными input() и print(); возвращает его вывод."""
+    feed = iter(inputs)
+    output = []
+
+    def fake_input(prompt=''):
+        return next(feed)
+
+    def fake_print(*args, sep=' ', end='\n', **kwargs):
+        output.append(sep.join(map(str, args)) + end)
+
+    exec(code, {'__name__': '__main__', '__file__': path, 'input': fake_input, 'print': fake_print})
+    return ''.join(output)
+
+
+def _lines(text):
+    return [line.rstrip() for line in text.splitlines() if line.strip()]
+
+
+def check(name, stream, path):
+    """
+    Сравнивает скрипт path с эталоном на всех тестах из stream.
+    Возвращает (число тестов, [(номер теста, входные значения, вывод скрипта, ответ эталона)]).
+    """
+    width, value_type, reference = EXERCISES[name]
+    with open(path, encoding='utf-8') as f:
+        code = compile(f.read(), path, 'exec')
+    mismatches, count = [], 0
+    cwd = os.getcwd()
+    try:
+        # Скрипты могут открывать свои файлы по относительному пути
+        os.chdir(os.path.dirname(os.path.abspath(path)))
+        for tokens, cases in iter_blocks(stream, width, value_type):
+            for k, expected in enumerate(reference(cases)):
+                inputs = tokens[k * width:(k + 1) * width]
+                try:
+                    actual = run_script(code, path, inputs)
+                except Exception as e:
+                    actual = f"{type(e).__name__}: {e}"
+                if _lines(actual) != _lines(expected):
+                    mismatches.append((count + k + 1, inputs, actual.rstrip(), expected))
+            count += len(cases)
+    finally:
+        os.chdir(cwd)
+    return count, mismatches
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный прогон упражнений с input()")
+    parser.add_argument('exercise', choices=sorted(EXERCISES), help="упражнение")
+    parser.add_argument('cases', nargs='?', help="файл тестов (по умолчанию stdin)")
+    parser.add_argument('--check', metavar='SCRIPT', help="сравнить скрипт с эталоном")
+    args = parser.parse_args(argv)
+
+    stream = open(args.cases, encoding='utf-8') if args.cases else sys.stdin
+    try:
+        if not args.check:
+            solve(args.exercise, stream, sys.stdout)
+            return 0
+        count, mismatches = check(args.exercise, stream, args.check)
+    finally:
+        if args.cases:
+            stream.close()
+
+    for number, inputs, actual, expected in mismatches[:SHOW_MISMATCHES]:
+        print(f"Тест {number} ({' '.join(inputs)}): получено {actual!r}, ожидалось {expected!r}")
+    print(f"Тестов: {count}, расхождений: {len(mismatches)}")
+    return 1 if mismatches else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
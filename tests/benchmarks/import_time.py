@@ -0,0 +1,54 @@
+"""
+Замер времени импорта tests.conftest (быстрый путь task-скриптов).
+
+    python -m tests.benchmarks.import_time
+
+Запускает интерпретатор с -X importtime, печатает суммарное время импорта
+и самые тяжелые модули. Завершается с кодом 1, если при импорте загрузились
+NumPy или matplotlib — они нужны только для графиков.
+"""
+import subprocess
+import sys
+
+from tests.conftest import repo_root
+
+# Модули, которых не должно быть на быстром пути
+HEAVY_MODULES = ('numpy', 'matplotlib')
+
+
+def measure(module='tests.conftest'):
+    """Возвращает список (модуль, собственное время, накопленное время) в микросекундах."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=repo_root(),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        # Формат строки: "import time:   self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        timings.append((name.strip(), int(self_us), int(cumulative_us)))
+    return timings
+
+
+def main():
+    timings = measure()
+    total_us = sum(self_us for _, self_us, _ in timings)
+    print(f"Импорт tests.conftest: {total_us / 1000:.1f} мс, модулей: {len(timings)}")
+    for name, self_us, _ in sorted(timings, key=lambda item: item[1], reverse=True)[:10]:
+        print(f"  {self_us / 1000:8.2f} мс  {name}")
+
+    heavy = sorted({name for name, _, _ in timings if name.split('.')[0] in HEAVY_MODULES})
+    if heavy:
+        print(f"Тяжелые модули на быстром пути: {', '.join(heavy)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
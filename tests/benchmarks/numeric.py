@@ -0,0 +1,98 @@
+"""
+Бенчмарк ядер tests.numeric против учебных циклов ("Факториал.py", "Сумма цифр числа.py").
+
+    python -m tests.benchmarks.numeric                       # n = 10^3 .. 10^6
+    python -m tests.benchmarks.numeric --sizes 1000 50000    # выбранные n
+
+Для каждого n замеряются: n! циклом и factorial(n); сумма цифр n! циклом x % 10 / x // 10
+и digit_sum; суммы цифр n случайных int64 поэлементным циклом и digit_sums.
+Циклы квадратичны, поэтому для больших n они пропускаются (см. *_LOOP_LIMIT).
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from tests.numeric import digit_sum, digit_sums, factorial
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+# Больше этих n циклы не запускаются: время уходит в минуты
+FACTORIAL_LOOP_LIMIT = 10 ** 5
+DIGIT_SUM_LOOP_LIMIT = 10 ** 4
+ARRAY_LOOP_LIMIT = 10 ** 5
+
+
+def loop_factorial(n):
+    f = 1
+    for x in range(1, n + 1):
+        f *= x
+    return f
+
+
+def loop_digit_sum(x):
+    total = 0
+    while x > 0:
+        total += x % 10
+        x = x // 10
+    return total
+
+
+def loop_digit_sums(values):
+    return [loop_digit_sum(abs(int(x))) for x in values]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _format(seconds):
+    return '—' if seconds is None else f"{seconds:.3f} с"
+
+
+def run(n, seed=0):
+    """Строки отчета [(название, время цикла или None, время ядра)] для одного n."""
+    rows = []
+    fast, fast_time = timed(factorial, n)
+    loop_time = None
+    if n <= FACTORIAL_LOOP_LIMIT:
+        slow, loop_time = timed(loop_factorial, n)
+        assert slow == fast, f"factorial({n}) не совпал с циклом"
+    rows.append((f"{n}!", loop_time, fast_time))
+
+    total, fast_time = timed(digit_sum, fast)
+    loop_time = None
+    if n <= DIGIT_SUM_LOOP_LIMIT:
+        expected, loop_time = timed(loop_digit_sum, fast)
+        assert expected == total, f"digit_sum({n}!) не совпал с циклом"
+    rows.append((f"сумма цифр {n}!", loop_time, fast_time))
+
+    values = np.random.default_rng(seed).integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max,
+                                                  size=n, dtype=np.int64)
+    sums, fast_time = timed(digit_sums, values)
+    loop_time = None
+    if n <= ARRAY_LOOP_LIMIT:
+        expected, loop_time = timed(loop_digit_sums, values)
+        assert expected == sums.tolist(), "digit_sums не совпал с циклом"
+    rows.append((f"суммы цифр {n} int64", loop_time, fast_time))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк factorial/digit_sum против циклов")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help="значения n")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'':32} {'цикл':>12} {'ядро':>12}")
+    for n in args.sizes:
+        for name, loop_time, fast_time in run(n, args.seed):
+            print(f"{name:32} {_format(loop_time):>12} {_format(fast_time):>12}", flush=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Бенчмарк конвейера регистрации и отчетов о прогрессе на синтетической истории.
+
+    python -m tests.benchmarks.pipeline                                # 10^3 .. 10^6 записей
+    python -m tests.benchmarks.pipeline --sizes 1000 10000             # выбранные размеры
+    python -m tests.benchmarks.pipeline --output baseline.json         # сохранить результаты
+    python -m tests.benchmarks.pipeline --compare baseline.json        # сравнить с базовой линией
+
+Для каждого размера создается временная копия репозитория (код tests/ и одна тема с заданиями)
+со своим git-репозиторием и result.db, заполненной синтетической историей (27 типов, много дат).
+Каждая фаза замеряется отдельно: время — без трассировки, пик памяти — повторным
+прогоном под tracemalloc. Результаты пишутся в JSON для сравнения между версиями.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from tests.conftest import repo_root
+
+DEFAULT_SIZES = [10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+
+# Во сколько раз фаза может замедлиться относительно базовой линии, прежде чем считаться регрессией
+DEFAULT_THRESHOLD = 1.5
+# Разница меньше этой (в секундах) считается шумом измерения
+NOISE_SECONDS = 0.01
+
+# Тема, файлы которой копируются во временный репозиторий (для переименований в result_register)
+SAMPLE_TOPIC = os.path.join('ЕГЭ', 'Тема 7')
+
+
+def generate_history(size, seed=0, types=27):
+    """Синтетическая история: строки (date_time, task_number, task_type, result) в хронологическом порядке."""
+    rng = random.Random(seed)
+    days = min(3650, max(30, size // 100))
+    start = datetime(2020, 1, 1)
+    seconds = sorted(rng.randrange(days * 86400) for _ in range(size))
+    return [((start + timedelta(seconds=s)).isoformat(), rng.randint(1, 40), rng.randint(1, types),
+             1 if rng.random() < 0.6 else 0)
+            for s in seconds]
+
+
+def make_sandbox(size, seed=0):
+    """Временная копия репозитория с git и заполненной result.db. Возвращает путь к ней."""
+    root = tempfile.mkdtemp(prefix='progress-bench-')
+    src = repo_root()
+    shutil.copytree(os.path.join(src, 'tests'), os.path.join(root, 'tests'),
+                    ignore=shutil.ignore_patterns('result.db*', '.render.*', '.commit.pending', '__pycache__'))
+    shutil.copytree(os.path.join(src, SAMPLE_TOPIC), os.path.join(root, SAMPLE_TOPIC))
+
+    # Пишем историю в исходную схему (как в старых БД): миграции выполнятся и будут замерены
+    with sqlite3.connect(os.path.join(root, 'tests', 'result.db')) as connection:
+        connection.execute('CREATE TABLE test (date_time DATETIME, task_number BIGINT, '
+                           'task_type INTEGER, result INTEGER)')
+        connection.executemany('INSERT INTO test VALUES (?, ?, ?, ?)', generate_history(size, seed))
+
+    for command in (['git', 'init', '-q'],
+                    ['git', 'config', 'user.name', 'bench'],
+                    ['git', 'config', 'user.email', 'bench@localhost'],
+                    ['git', 'add', '-A'],
+                    ['git', 'commit', '-q', '-m', 'bench']):
+        subprocess.run(command, cwd=root, check=True, stdout=subprocess.DEVNULL)
+    return root
+
+
+def _measure(func, repeat_for_memory=True):
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    peak_kb = None
+    if repeat_for_memory:
+        tracemalloc.start()
+        try:
+            func()
+            peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+        finally:
+            tracemalloc.stop()
+    return {'seconds': round(seconds, 6), 'peak_kb': peak_kb}
+
+
+def run_phases():
+    """Замеряет фазы в текущем (временном) репозитории. Выполняется в отдельном процессе."""
+    from tests import conftest
+
+    results = {}
+    # Первое подключение применяет миграции (индексы, агрегат, номера дней) — один раз
+    results['migrate'] = _measure(conftest.get_connection, repeat_for_memory=False)
+
+    counter = iter(range(10 ** 9))
+
+    def add_result():
+        for _ in range(20):
+            conftest.add_result(datetime.now().isoformat(), 1000 + next(counter), 1, 0)
+
+    phase = _measure(add_result)
+    phase['seconds'] = round(phase['seconds'] / 20, 6)  # на одну запись
+    results['add_result'] = phase
+
+    results['get_results'] = _measure(conftest.get_results)
+
+    from tests import charts
+    from tests.progress import progress_columns
+    results['progress_columns'] = _measure(progress_columns)
+
+    def close(fig_factory):
+        return lambda: charts.plt.close(fig_factory())
+
+    results['show_common_progress'] = _measure(close(charts.show_common_progress))
+    results['show_detailed_progress_table'] = _measure(close(charts.show_detailed_progress_table))
+
+    from tests import svg_charts
+    results['svg_common_progress'] = _measure(svg_charts.show_common_progress)
+    results['svg_detailed_progress_table'] = _measure(svg_charts.show_detailed_progress_table)
+    results['render_progress'] = _measure(lambda: conftest.render_progress(force=True))
+
+    def register():
+        # Новый номер задания, чтобы запись точно добавилась и графики перерисовались
+        conftest.result_register(7, 10 ** 6 + next(counter), 0, 'bench')
+
+    results['result_register'] = _measure(register, repeat_for_memory=False)
+    return results
+
+
+def run(sizes, seed=0):
+    report = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': {},
+    }
+    for size in sizes:
+        root = make_sandbox(size, seed)
+        try:
+            child = subprocess.run([sys.executable, '-m', 'tests.benchmarks.pipeline', '--child'],
+                                   cwd=root, check=True, stdout=subprocess.PIPE, text=True,
+                                   env={**os.environ, 'PROGRESS_RENDER': 'sync', 'PROGRESS_GIT_DEFER': ''})
+            report['results'][str(size)] = json.loads(child.stdout.splitlines()[-1])
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+        print(f"{size:>9} записей:", file=sys.stderr)
+        for phase, values in report['results'][str(size)].items():
+            peak = f"{values['peak_kb']:>9} КБ" if values['peak_kb'] is not None else ''
+            print(f"    {phase:<30} {values['seconds'] * 1000:>10.1f} мс {peak}", file=sys.stderr)
+    return report
+
+
+def compare(report, baseline, threshold=DEFAULT_THRESHOLD):
+    """Список регрессий: (размер, фаза, было, стало) для фаз, замедлившихся больше чем в threshold раз."""
+    regressions = []
+    for size, phases in report['results'].items():
+        for phase, values in phases.items():
+            old = baseline.get('results', {}).get(size, {}).get(phase)
+            if (old and old['seconds'] > 0 and values['seconds'] / old['seconds'] > threshold
+                    and values['seconds'] - old['seconds'] > NOISE_SECONDS):
+                regressions.append((size, phase, old['seconds'], values['seconds']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк конвейера регистрации ответов")
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help="размеры истории")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="куда записать результаты (JSON)")
+    parser.add_argument('--compare', help="файл базовой линии для сравнения")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(run_phases()))
+        return 0
+
+    report = run(args.sizes, args.seed)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for size, phase, old, new in regressions:
+            print(f"Регрессия: {phase} на {size} записях: {old * 1000:.1f} мс -> {new * 1000:.1f} мс")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,177 @@
+"""
+Графики прогресса. Модуль импортируется лениво из conftest только при отрисовке,
+чтобы task-скрипты не платили за загрузку NumPy и matplotlib.
+"""
+import os
+
+import matplotlib
+
+# Картинки только сохраняются в файлы — интерактивный backend не нужен,
+# если пользователь явно не выбрал другой через MPLBACKEND
+if not os.environ.get('MPLBACKEND'):
+    matplotlib.use('Agg')
+
+import numpy as np
+from matplotlib import pyplot as plt
+from matplotlib.collections import PathCollection
+from matplotlib.colors import Normalize, LinearSegmentedColormap, ListedColormap
+from matplotlib.font_manager import FontProperties
+from matplotlib.path import Path
+from matplotlib.textpath import TextPath
+from matplotlib.transforms import Affine2D
+import matplotlib.patches as mpatches
+
+from .conftest import day_to_date
+from .progress import DETAILED_TABLE_DAYS, DETAILED_TABLE_PAGES, common_progress, detailed_pages, detailed_window
+
+
+def save_figure(fig, path):
+    """Сохраняет фигуру в файл и освобождает ее."""
+    fig.savefig(path)
+    plt.close(fig)
+
+
+def cell_labels(ax, cell_texts, fontsize=8):
+    """
+    Подписи ячеек одной коллекцией контуров вместо отдельного ax.text на каждую ячейку.
+    Контур каждой строки ("+7", "-16") строится один раз и переиспользуется.
+    """
+    prop = FontProperties(size=fontsize)
+    line_height = fontsize * 1.2
+    glyphs = {}
+
+    def line_path(line):
+        if line not in glyphs:
+            path = TextPath((0, 0), line, prop=prop)
+            extents = path.get_extents()
+            glyphs[line] = path.transformed(Affine2D().translate(-(extents.x0 + extents.x1) / 2, 0))
+        return glyphs[line]
+
+    paths, offsets = [], []
+    for (i, j), text in cell_texts.items():
+        lines = text.split("\n")
+        parts = []
+        for k, line in enumerate(lines):
+            # Строки сверху вниз, блок по центру ячейки; 0.35 — середина строчных букв над базовой линией
+            dy = ((len(lines) - 1) / 2 - k) * line_height - fontsize * 0.35
+            parts.append(line_path(line).transformed(Affine2D().translate(0, dy)))
+        paths.append(Path.make_compound_path(*parts))
+        offsets.append((j, i))
+
+    # Контуры заданы в пунктах, смещения — в координатах данных (центр ячейки)
+    labels = PathCollection(paths, offsets=offsets, offset_transform=ax.transData,
+                            transform=Affine2D().scale(1 / 72) + ax.figure.dpi_scale_trans,
+                            facecolor='black', edgecolor='none')
+    ax.add_collection(labels, autolim=False)
+    return labels
+
+
+def show_detailed_progress_table(last_dates=DETAILED_TABLE_DAYS, date_from=None, date_to=None, columns=None):
+    """
+    Создает таблицу, где:
+    - По горизонтали расположены типы заданий (1-27)
+    - По вертикали расположены даты решения
+    - На пересечении отображаются номера заданий с цветовой индикацией правильности решения
+    Показываются только последние last_dates дат (None — все) в пределах [date_from, date_to],
+    поэтому размер картинки не растет вместе с историей.
+    """
+    return detailed_figure(detailed_window(last_dates, date_from, date_to, columns))
+
+
+def detailed_figure(table):
+    """Рисует детальную таблицу по данным progress.detailed_window (None — нет данных)."""
+    if table is None:
+        fig, ax = plt.subplots(figsize=(12, 5))
+        ax.text(0.5, 0.5, "Нет данных для отображения", ha='center', va='center', fontsize=14)
+        ax.set_axis_off()
+        return fig
+
+    # Даты — последние сверху, типы заданий по порядку; в ячейке — средний результат
+    # и номера заданий с индикацией правильности
+    days, sorted_types, table_data, cell_texts = table
+    sorted_dates = [day_to_date(day) for day in days]
+
+    # Создаем фигуру и оси
+    fig, ax = plt.subplots(figsize=(15, max(5, len(sorted_dates) * 0.4)))
+
+    # Создаем цветовую карту: красный для неверных, зеленый для верных, серый для отсутствующих
+    cmap = ListedColormap(['#ffcccc', '#ccffcc'])  # Светло-красный, светло-зеленый
+
+    # Создаем таблицу
+    im = ax.imshow(table_data, cmap=cmap, aspect='auto', interpolation='none', alpha=0.7)
+
+    # Добавляем текст в ячейки
+    cell_labels(ax, cell_texts, fontsize=8)
+
+    # Настраиваем оси
+    ax.set_xticks(np.arange(len(sorted_types)))
+    ax.set_yticks(np.arange(len(sorted_dates)))
+    ax.set_xticklabels([f"{t}" for t in sorted_types])
+    ax.set_yticklabels([date.strftime('%Y-%m-%d') for date in sorted_dates])
+    ax.xaxis.set_tick_params(top=True, bottom=False, labeltop=True, labelbottom=False)
+
+    # Добавляем сетку для лучшей читаемости
+    ax.set_xticks(np.arange(-.5, len(sorted_types), 1), minor=True)
+    ax.set_yticks(np.arange(-.5, len(sorted_dates), 1), minor=True)
+    ax.grid(which="minor", color="w", linestyle='-', linewidth=2)
+
+    # Добавляем заголовок и легенду
+    ax.set_title("Детальный прогресс по заданиям")
+
+    # Создаем легенду
+    red_patch = mpatches.Patch(color='#ffcccc', label='Неверно')
+    green_patch = mpatches.Patch(color='#ccffcc', label='Верно')
+    ax.legend(handles=[red_patch, green_patch], loc='upper right')
+
+    # Настраиваем размер фигуры и отступы
+    plt.tight_layout()
+
+    return fig
+
+def detailed_progress_pages(days_per_page=DETAILED_TABLE_DAYS, pages=DETAILED_TABLE_PAGES, columns=None):
+    """
+    Детальная таблица по страницам (см. progress.page_windows).
+    Возвращает список фигур (не больше pages, пустые страницы не создаются).
+    """
+    return [detailed_figure(table) for table in detailed_pages(days_per_page, pages, columns)]
+
+
+def show_common_progress(columns=None, solved=None):
+    """
+    Получить из БД все разультаты и сгруппировать их по полю task_type.
+    Для каждого типа посчитать процент правильных ответов среди всех решенных заданий данного типа,
+    в подсчёт включаются только данные за последние 5 дат.
+    При этом необходимо находить среднее значение по каждому номеру задания (task_number).
+    Построить гистограмму, где на оси X будут номера тем, а на Y — процент правильных ответов.
+    columns и solved — уже загруженные ячейки (см. progress.chart_columns); по умолчанию читаются из БД.
+    """
+    # Считаем процент по каждому типу: берём последние 5 дат, считаем среднее по каждому task_number,
+    # затем усредняем по task_number, переводим в проценты и умножаем на коэффициент
+    # за количество верно решённых заданий
+    x_types = list(range(1, 28))  # 1..27
+    percentages = common_progress(x_types, columns, solved)
+
+    return progress_bars(x_types, percentages, 'Общий прогресс')
+
+
+def progress_bars(x_types, percentages, title):
+    """Гистограмма показателя успеваемости по темам (общий вид для ученика и для класса)."""
+    # Построение гистограммы
+    fig, ax = plt.subplots(figsize=(12, 5))
+    norm = Normalize(vmin=0, vmax=100)
+    # Цветовая схема
+    cmap = LinearSegmentedColormap.from_list("red_green", ["red", "orange", "green"])
+    colors = cmap(norm(percentages))
+    bars = ax.bar(x_types, percentages, color=colors)
+    # ---
+    for bar, val in zip(bars, percentages):
+        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() / 2,
+                f"{val:.1f}", ha='center', va='center', color='black')
+
+    ax.set_xlabel('Номер темы')
+    ax.set_ylabel('Показатель успеваемости')
+    ax.set_title(title)
+    ax.set_xticks(x_types)
+    ax.set_ylim(0, 100)
+
+    return fig
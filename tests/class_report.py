@@ -0,0 +1,119 @@
+"""
+Отчет по классу: показатели show_common_progress для каждого ученика и среднее по классу.
+
+Данные каждого ученика лежат в tests/students/<имя>/result.db (регистрация с переменной
+окружения PROGRESS_STUDENT=<имя>). Базы обрабатываются параллельно: из каждой читается
+только агрегат progress (число ячеек, а не вся история), метрики считаются колоночным движком.
+Базы открываются только для чтения; базы со старой схемой в отчет не входят — их нужно
+мигрировать, выполнив любую регистрацию от имени ученика.
+
+    python -m tests.class_report
+    python -m tests.class_report --csv class.csv --chart class_progress.png
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from urllib.request import pathname2url
+
+from tests.conftest import BUSY_TIMEOUT_MS, MIGRATIONS, students_root
+from tests.progress import common_percentages, progress_columns
+
+# Темы на оси X, как в show_common_progress
+TASK_TYPES = list(range(1, 28))
+
+
+def student_databases(directory=None):
+    """{имя ученика: путь к result.db} для всех папок учеников."""
+    directory = directory or students_root()
+    databases = {}
+    if not os.path.isdir(directory):
+        return databases
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            path = os.path.join(entry.path, 'result.db')
+            if entry.is_dir() and os.path.exists(path):
+                databases[entry.name] = path
+    return dict(sorted(databases.items()))
+
+
+def student_percentages(path):
+    """
+    Показатели по темам TASK_TYPES для одной базы или None, если схема базы устарела.
+    Отчет только читает: миграции (см. conftest.MIGRATIONS) здесь не выполняются.
+    """
+    connection = sqlite3.connect(f'file:{pathname2url(os.path.abspath(path))}?mode=ro', uri=True,
+                                 timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+    try:
+        if connection.execute('PRAGMA user_version').fetchone()[0] < len(MIGRATIONS):
+            return None
+        progress = connection.execute('SELECT task_type, day, task_number, attempts, correct, last_result '
+                                      'FROM progress').fetchall()
+    finally:
+        connection.close()
+    return common_percentages(progress_columns(progress), TASK_TYPES)
+
+
+def class_report(directory=None, jobs=None):
+    """
+    Возвращает ({имя: [показатель по темам]}, [среднее по классу по темам],
+    [ученики, чьи базы нужно мигрировать]).
+    SQLite и NumPy отпускают GIL на тяжелых операциях, поэтому базы читаются в пуле потоков.
+    """
+    databases = student_databases(directory)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        results = dict(zip(databases, pool.map(student_percentages, databases.values())))
+    per_student = {name: values for name, values in results.items() if values is not None}
+    stale = [name for name, values in results.items() if values is None]
+    if not per_student:
+        return {}, [0.0] * len(TASK_TYPES), stale
+    average = [sum(values[i] for values in per_student.values()) / len(per_student)
+               for i in range(len(TASK_TYPES))]
+    return per_student, average, stale
+
+
+def write_csv(file, per_student, average):
+    writer = csv.writer(file)
+    writer.writerow(['ученик'] + TASK_TYPES)
+    for name, values in per_student.items():
+        writer.writerow([name] + [f"{v:.1f}" for v in values])
+    writer.writerow(['среднее'] + [f"{v:.1f}" for v in average])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Отчет об успеваемости класса")
+    parser.add_argument('directory', nargs='?', help="папка с учениками (по умолчанию tests/students)")
+    parser.add_argument('--csv', help="записать таблицу в CSV")
+    parser.add_argument('--chart', help="сохранить гистограмму среднего по классу (.svg или .png)")
+    parser.add_argument('-j', '--jobs', type=int, default=None)
+    args = parser.parse_args(argv)
+
+    per_student, average, stale = class_report(args.directory, args.jobs)
+    for name in stale:
+        print(f"Пропущен {name}: база требует миграции", file=sys.stderr)
+    if not per_student:
+        print("Базы учеников не найдены")
+        return 1
+
+    if args.csv:
+        with open(args.csv, 'w', encoding='utf-8', newline='') as f:
+            write_csv(f, per_student, average)
+    else:
+        write_csv(sys.stdout, per_student, average)
+
+    if args.chart:
+        # SVG строится без matplotlib; любое другое расширение — через matplotlib
+        if args.chart.lower().endswith('.svg'):
+            from tests import svg_charts as charts
+        else:
+            from tests import charts
+        charts.save_figure(charts.progress_bars(TASK_TYPES, average,
+                                                f'Средний прогресс класса ({len(per_student)} учеников)'),
+                           args.chart)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,31 +1,102 @@
+import atexit
 import hashlib
 import os
+import re
 import sqlite3
 import subprocess
-from collections import defaultdict
-from datetime import datetime
+import time
+import uuid
+from datetime import date, datetime
 
-import numpy as np
-from matplotlib import pyplot as plt
-from matplotlib.colors import Normalize, LinearSegmentedColormap, ListedColormap
-import matplotlib.patches as mpatches
+# Только стандартная библиотека: task-скрипты импортируют этот модуль ради проверки ответа.
+# NumPy и matplotlib загружаются лениво — при построении графиков (tests/progress.py, tests/charts.py).
+
+
+# ---------------------------------------------------------------------------
+# Замеры фаз регистрации.
+# PROGRESS_TIMINGS=print — печатать сводку после регистрации,
+# PROGRESS_TIMINGS=db — дописывать замеры в таблицу timings, можно оба: print,db.
+# Без переменной span() возвращает общий пустой объект и почти ничего не стоит.
+# ---------------------------------------------------------------------------
+TIMINGS = {mode.strip() for mode in os.environ.get('PROGRESS_TIMINGS', '').split(',') if mode.strip()}
+
+# Замеры текущей регистрации: (фаза, секунды)
+_spans = []
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _spans.append((self.name, time.perf_counter() - self.start))
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """Замер фазы: with span('sqlite'): ... Без PROGRESS_TIMINGS ничего не замеряет."""
+    return _Span(name) if TIMINGS else _NO_SPAN
+
+
+def report_spans(label):
+    """Печатает и/или сохраняет замеры текущей регистрации и очищает их."""
+    if not _spans:
+        return
+    spans = list(_spans)
+    _spans.clear()
+
+    totals = {}
+    for name, seconds in spans:
+        totals[name] = totals.get(name, 0.0) + seconds
+    if 'print' in TIMINGS:
+        print(f"Замеры ({label}):")
+        for name, seconds in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+            print(f"  {name:<12} {seconds * 1000:9.1f} мс")
+    if 'db' in TIMINGS:
+        created = datetime.now().isoformat()
+        with transaction() as cursor:
+            cursor.executemany('INSERT INTO timings (created, label, phase, seconds) VALUES (?, ?, ?, ?)',
+                               ((created, label, name, seconds) for name, seconds in spans))
 
 
 def repo_root():
     # Корень репозитория — родительская папка для tests/
     return os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 
-def git_add_file(file_path):
-    """Добавляет файл в отслеживаемые Git."""
-    try:
-        # Проверяем, находится ли файл в Git-репозитории
-        git_dir = os.path.join(repo_root(), '.git')
-        if not os.path.isdir(git_dir):
-            return False, "Директория .git не найдена, возможно это не Git-репозиторий"
+# Результат проверки наличия .git кешируется: корень репозитория за время работы не меняется
+_git_dirs = {}
+
+
+def _git_available():
+    root = repo_root()
+    if root not in _git_dirs:
+        _git_dirs[root] = os.path.isdir(os.path.join(root, '.git'))
+    return _git_dirs[root]
 
-        # Выполняем команду git add для указанного файла
-        result = subprocess.run(
-            ['git', 'add', file_path],
+
+def _git_add(file_paths):
+    with span('git_add'):
+        return subprocess.run(
+            ['git', 'add', '-A', '--', *file_paths],
             cwd=repo_root(),  # Устанавливаем рабочую директорию в корень репозитория
             check=False,  # Не вызываем исключение при ошибке
             stdout=subprocess.PIPE,
@@ -33,53 +104,467 @@ def git_add_file(file_path):
             text=True
         )
 
+
+def _addable_paths(file_paths):
+    """
+    Пути, которые примет git add: существующие файлы и удаленные, но отслеживаемые Git.
+    Старое имя переименованного файла, который ни разу не коммитили, git add отвергает
+    ("pathspec did not match") — вместе со всеми остальными путями вызова.
+    """
+    missing = [path for path in file_paths if not os.path.exists(path)]
+    if not missing:
+        return list(file_paths)
+    with span('git_add'):
+        result = subprocess.run(['git', 'ls-files', '-z', '--', *missing], cwd=repo_root(), check=False,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    tracked = {os.path.normcase(os.path.join(repo_root(), name)) for name in result.stdout.split('\0') if name}
+    return [path for path in file_paths
+            if os.path.exists(path) or os.path.normcase(os.path.abspath(path)) in tracked]
+
+
+def git_add_files(file_paths):
+    """
+    Добавляет файлы в индекс Git одним вызовом git add.
+    Флаг -A также индексирует удаление: старое имя переименованного файла уходит из индекса.
+    Если git add отверг вызов (например, старое имя никогда не было в Git), он повторяется
+    только с путями, которые Git может принять.
+    """
+    try:
+        # Проверяем, находится ли файл в Git-репозитории
+        if not _git_available():
+            return False, "Директория .git не найдена, возможно это не Git-репозиторий"
+
+        # Выполняем одну команду git add для всех файлов
+        result = _git_add(file_paths)
+        if result.returncode != 0:
+            paths = _addable_paths(file_paths)
+            if not paths:
+                return True, "Нет файлов для добавления"
+            if len(paths) < len(file_paths):
+                result = _git_add(paths)
+
         if result.returncode == 0:
-            return True, "Файл успешно добавлен в отслеживаемые"
+            return True, "Файлы успешно добавлены в отслеживаемые"
         else:
-            return False, f"Ошибка при добавлении файла: {result.stderr}"
+            return False, f"Ошибка при добавлении файлов: {result.stderr}"
     except Exception as e:
         return False, f"Исключение при работе с Git: {str(e)}"
 
 
+def git_add_file(file_path):
+    """Добавляет файл в отслеживаемые Git."""
+    return git_add_files([file_path])
+
+
+# Файлы, измененные при регистрации; индексируются одним git add в commit_staged
+_staged_paths = []
+
+
+def stage_file(file_path):
+    """Запоминает файл для добавления в Git при ближайшем commit_staged."""
+    if file_path not in _staged_paths:
+        _staged_paths.append(file_path)
+
+
+def take_staged():
+    """Забирает из очереди файлы, еще не добавленные в Git (см. stage_file)."""
+    paths = list(_staged_paths)
+    _staged_paths.clear()
+    return paths
+
+
+def drop_unchanged_staged():
+    """
+    Убирает очередь файлов, если ни один из них не отличается от закоммиченного (один git status).
+    Так повторная регистрация без изменений не запускает ни git add, ни git commit.
+    """
+    if not _staged_paths:
+        return
+    if not _git_available():
+        _staged_paths.clear()
+        return
+    with span('git_status'):
+        # В отличие от git diff, git status показывает и неотслеживаемые файлы
+        result = subprocess.run(['git', 'status', '--porcelain', '-z', '--', *_staged_paths],
+                                cwd=repo_root(), check=False,
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    if result.returncode == 0 and not result.stdout:
+        _staged_paths.clear()
+
+
+def flush_staged():
+    """
+    Добавляет все запомненные файлы в индекс Git одним вызовом.
+    Если git add не удался (например, индекс занят другим процессом), файлы остаются в очереди.
+    """
+    if not _staged_paths:
+        return True, "Нет файлов для добавления"
+    paths = take_staged()
+    success, message = git_add_files(paths)
+    if not success:
+        for path in paths:
+            stage_file(path)
+    return success, message
+
+
+# Отложенный коммит: файлы индексируются сразу, а коммит создает только явный вызов commit_pending()
+GIT_DEFER_COMMIT = os.environ.get('PROGRESS_GIT_DEFER') == '1'
+
+
+def _pending_commit_path():
+    # У каждого ученика своя очередь сообщений (см. data_dir)
+    return os.path.join(data_dir(), '.commit.pending')
+
+
+def commit_message(messages):
+    """Одно сообщение коммита на серию регистраций."""
+    if len(messages) == 1:
+        return messages[0]
+    return f"Обновлен статус заданий ({len(messages)})\n\n" + "\n".join(messages)
+
+
+def commit_staged(message):
+    """
+    Индексирует запомненные файлы (один git add) и создает коммит (один git commit).
+    При GIT_DEFER_COMMIT сообщение откладывается до commit_pending().
+    """
+    success, message_add = flush_staged()
+    if not success:
+        print(f"Предупреждение при добавлении файлов в Git: {message_add}")
+    if GIT_DEFER_COMMIT:
+        with open(_pending_commit_path(), 'a', encoding='utf-8') as f:
+            f.write(message.replace('\n', ' ') + '\n')
+        success_commit = True
+    else:
+        success_commit, message_commit = git_commit(message)
+        if not success_commit:
+            print(f"Предупреждение при создании коммита: {message_commit}")
+    if success and success_commit or not _git_available():
+        _save_fingerprint()
+    else:
+        # Отпечаток не сохраняем: следующая регистрация перерисует графики и повторит коммит
+        _discard_fingerprint()
+
+
+def commit_pending():
+    """Создает один коммит на все отложенные регистрации (см. GIT_DEFER_COMMIT)."""
+    flush_staged()
+    try:
+        with open(_pending_commit_path(), encoding='utf-8') as f:
+            messages = [line.strip() for line in f if line.strip()]
+    except FileNotFoundError:
+        messages = []
+    success_commit, message_commit = git_commit(commit_message(messages) if messages else
+                                                "Автоматическое обновление статуса заданий")
+    if success_commit and messages:
+        os.remove(_pending_commit_path())
+    return success_commit, message_commit
+
+
 def git_commit(message="Автоматическое обновление статуса заданий"):
     """Создает коммит с указанным сообщением."""
     try:
         # Проверяем, находится ли файл в Git-репозитории
-        git_dir = os.path.join(repo_root(), '.git')
-        if not os.path.isdir(git_dir):
+        if not _git_available():
             return False, "Директория .git не найдена, возможно это не Git-репозиторий"
 
         # Выполняем команду git commit
-        result = subprocess.run(
-            ['git', 'commit', '-m', message],
-            cwd=repo_root(),  # Устанавливаем рабочую директорию в корень репозитория
-            check=False,  # Не вызываем исключение при ошибке
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        with span('git_commit'):
+            result = subprocess.run(
+                ['git', 'commit', '-m', message],
+                cwd=repo_root(),  # Устанавливаем рабочую директорию в корень репозитория
+                check=False,  # Не вызываем исключение при ошибке
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True
+            )
 
         if result.returncode == 0:
             return True, "Коммит успешно создан"
         else:
             # Если нет изменений для коммита, это не ошибка
-            if "nothing to commit" in result.stdout or "nothing to commit" in result.stderr:
+            # (в том числе когда изменены только неотслеживаемые в индексе файлы, например result.db)
+            output = result.stdout + result.stderr
+            if "nothing to commit" in output or "no changes added to commit" in output:
                 return True, "Нет изменений для коммита"
             return False, f"Ошибка при создании коммита: {result.stderr}"
     except Exception as e:
         return False, f"Исключение при работе с Git: {str(e)}"
 
 
+def students_root():
+    # Папка с данными учеников класса: tests/students/<имя>/
+    return os.path.join(repo_root(), 'tests', 'students')
+
+
+def student_name():
+    """
+    Имя ученика из PROGRESS_STUDENT или None, если общая БД.
+    Имя — одна папка внутри tests/students: разделители путей и '..' не допускаются.
+    """
+    student = os.environ.get('PROGRESS_STUDENT')
+    if not student:
+        return None
+    if student in ('.', '..') or os.path.splitdrive(student)[0] \
+            or any(sep and sep in student for sep in (os.sep, os.altsep, '/')):
+        raise ValueError(f"PROGRESS_STUDENT={student!r}: имя ученика не должно содержать путь")
+    return student
+
+
+def data_dir():
+    """
+    Папка с БД и картинками прогресса текущего ученика.
+    По умолчанию tests/; если задана переменная PROGRESS_STUDENT — tests/students/<имя>/.
+    """
+    student = student_name()
+    if student:
+        return os.path.join(students_root(), student)
+    return os.path.join(repo_root(), 'tests')
+
+
 def db_path():
-    # БД всегда в tests/result.db относительно корня репозитория
-    return os.path.join(repo_root(), 'tests', 'result.db')
+    # БД лежит в tests/result.db (или в папке ученика, см. data_dir) относительно корня репозитория
+    return os.path.join(data_dir(), 'result.db')
 
 
-def create_new_db():
-    os.makedirs(os.path.dirname(db_path()), exist_ok=True)
-    with sqlite3.connect(db_path()) as connection:
-        cursor = connection.cursor()
-        cursor.execute('''
+# Соединение с БД переиспользуется в пределах процесса (см. get_connection)
+_connection = None
+_connection_key = None
+
+# Сколько миллисекунд ждать снятия блокировки, если БД занята другим скриптом
+BUSY_TIMEOUT_MS = 5000
+
+# Атомарная вставка: правильный ответ на задание записывается не более одного раза,
+# после правильного ответа новые записи по заданию не добавляются
+INSERT_RESULT_SQL = '''
+    INSERT INTO test (date_time, task_number, task_type, result, day, timestamp, answer_hash)
+    SELECT ?, ?, ?, ?, ?, ?, ?
+    WHERE NOT EXISTS (SELECT 1 FROM test WHERE task_type = ? AND task_number = ? AND result = 1)
+    ON CONFLICT DO NOTHING
+'''
+
+
+# Порядковый номер 1970-01-01: день записи хранится как число дней от этой даты
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def result_date(date_time):
+    """
+    Возвращает дату (datetime.date) из значения date_time или None, если его не разобрать.
+    Сначала пробуем ISO-формат, затем timestamp — старые записи хранят время как число.
+    """
+    moment = _result_datetime(date_time)
+    return moment.date() if moment else None
+
+
+def _result_datetime(date_time):
+    try:
+        return datetime.fromisoformat(str(date_time))
+    except Exception:
+        try:
+            return datetime.fromtimestamp(float(date_time))
+        except Exception:
+            return None
+
+
+def date_keys(date_time):
+    """
+    Нормализует date_time при записи: возвращает (day, timestamp), где day — номер дня
+    от 1970-01-01 по местной дате, timestamp — секунды Unix. Для неразборчивых значений (None, None).
+    """
+    moment = _result_datetime(date_time)
+    if moment is None:
+        return None, None
+    return moment.toordinal() - EPOCH_ORDINAL, moment.timestamp()
+
+
+def day_to_date(day):
+    """Обратное преобразование номера дня в datetime.date."""
+    return date.fromordinal(EPOCH_ORDINAL + int(day))
+
+
+def date_to_day(value):
+    """Номер дня от 1970-01-01 для datetime.date (или datetime)."""
+    return value.toordinal() - EPOCH_ORDINAL
+
+
+def normalize_result(result):
+    """Приводит результат к 0/1. Для некорректных значений возвращает None."""
+    try:
+        return 1 if int(result) == 1 else 0
+    except Exception:
+        return None
+
+
+# Агрегат по ячейке (тип, день, номер): число попыток, число верных и последний результат
+UPSERT_PROGRESS_SQL = '''
+    INSERT INTO progress (task_type, day, task_number, attempts, correct, last_result)
+    VALUES (?, ?, ?, 1, ?, ?)
+    ON CONFLICT (task_type, day, task_number) DO UPDATE SET
+        attempts    = attempts + 1,
+        correct     = correct + excluded.correct,
+        last_result = excluded.last_result
+'''
+
+
+def _touch_progress(cursor):
+    """Увеличивает номер версии агрегата (см. progress_fingerprint) в той же транзакции."""
+    cursor.execute('UPDATE progress_version SET version = version + 1')
+
+
+def _update_progress(cursor, day, task_number, task_type, result):
+    """Учитывает только что добавленную запись в таблице progress."""
+    r = normalize_result(result)
+    if r is None or day is None:
+        return  # графики такие записи тоже пропускают
+    cursor.execute(UPSERT_PROGRESS_SQL, (int(task_type), day, int(task_number), r, r))
+    _touch_progress(cursor)
+
+
+def _rebuild_progress(cursor, task_type=None, task_number=None):
+    """Пересчитывает таблицу progress по истории (целиком или для одного задания)."""
+    _fill_progress(cursor, task_type, task_number)
+    _touch_progress(cursor)
+
+
+def _fill_progress(cursor, task_type=None, task_number=None):
+    """
+    Заполняет таблицу progress по истории, не меняя номер версии (в миграциях ее таблицы еще нет).
+    Ячейки накапливаются в памяти и вставляются одним executemany — миллионы записей за секунды.
+    """
+    if task_type is None:
+        cursor.execute('DELETE FROM progress')
+        rows = cursor.execute('SELECT day, task_number, task_type, result FROM test ORDER BY rowid').fetchall()
+    else:
+        cursor.execute('DELETE FROM progress WHERE task_type = ? AND task_number = ?', (task_type, task_number))
+        rows = cursor.execute('SELECT day, task_number, task_type, result FROM test '
+                              'WHERE task_type = ? AND task_number = ? ORDER BY rowid',
+                              (task_type, task_number)).fetchall()
+    cells = {}  # (тип, день, номер) -> [попыток, верных, последний результат]
+    for day, number, t, result in rows:
+        r = normalize_result(result)
+        if r is None or day is None:
+            continue  # как и в _update_progress
+        cell = cells.get((int(t), day, int(number)))
+        if cell is None:
+            cells[(int(t), day, int(number))] = [1, r, r]
+        else:
+            cell[0] += 1
+            cell[1] += r
+            cell[2] = r
+    cursor.executemany('INSERT INTO progress (task_type, day, task_number, attempts, correct, last_result) '
+                       'VALUES (?, ?, ?, ?, ?, ?)', (key + tuple(cell) for key, cell in cells.items()))
+
+
+def _migrate_indexes(cursor):
+    cursor.execute('CREATE INDEX IF NOT EXISTS test_type_number ON test (task_type, task_number, result)')
+    try:
+        # Гарантия на уровне БД: не больше одного правильного ответа на задание
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS test_correct_once '
+                       'ON test (task_type, task_number) WHERE result = 1')
+    except sqlite3.IntegrityError:
+        # В старых БД уже могут быть повторные правильные ответы — историю не трогаем,
+        # от дублей защищает условие NOT EXISTS в INSERT_RESULT_SQL
+        pass
+
+
+def _migrate_progress(cursor):
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS progress (
+                                                           task_type   INTEGER NOT NULL,
+                                                           date        TEXT    NOT NULL,
+                                                           task_number BIGINT  NOT NULL,
+                                                           attempts    INTEGER NOT NULL,
+                                                           correct     INTEGER NOT NULL,
+                                                           last_result INTEGER NOT NULL,
+                                                           PRIMARY KEY (task_type, date, task_number)
+                   )
+                   ''')
+    # Заполнение по истории выполняет следующая миграция: она пересоздает агрегат
+
+
+def _migrate_day_keys(cursor):
+    # Нормализованная дата записи: номер дня (для группировки) и полный timestamp
+    cursor.execute('ALTER TABLE test ADD COLUMN day INTEGER')
+    cursor.execute('ALTER TABLE test ADD COLUMN timestamp REAL')
+    rows = cursor.execute('SELECT rowid, date_time FROM test').fetchall()
+    cursor.executemany('UPDATE test SET day = ?, timestamp = ? WHERE rowid = ?',
+                       (date_keys(date_time) + (rowid,) for rowid, date_time in rows))
+
+    # Агрегат теперь ключуется номером дня вместо текстовой даты
+    cursor.execute('DROP TABLE IF EXISTS progress')
+    cursor.execute('''
+                   CREATE TABLE progress (
+                                                           task_type   INTEGER NOT NULL,
+                                                           day         INTEGER NOT NULL,
+                                                           task_number BIGINT  NOT NULL,
+                                                           attempts    INTEGER NOT NULL,
+                                                           correct     INTEGER NOT NULL,
+                                                           last_result INTEGER NOT NULL,
+                                                           PRIMARY KEY (task_type, day, task_number)
+                   )
+                   ''')
+    # Однократное заполнение агрегата по уже накопленной истории
+    _fill_progress(cursor)
+
+
+def _migrate_timings(cursor):
+    # Замеры фаз регистрации (см. PROGRESS_TIMINGS)
+    cursor.execute('''
+                   CREATE TABLE IF NOT EXISTS timings (
+                                                           created TEXT,
+                                                           label   TEXT,
+                                                           phase   TEXT,
+                                                           seconds REAL
+                   )
+                   ''')
+
+
+def _migrate_day_index(cursor):
+    # Выборки истории по диапазону дат (см. tests/history.py)
+    cursor.execute('CREATE INDEX IF NOT EXISTS test_day ON test (day)')
+
+
+def _migrate_answer_hash(cursor):
+    # md5 присланного ответа: по нему историю можно перепроверить при смене эталона (см. tests/regrade.py).
+    # У записей, сделанных до этой миграции, хеша нет
+    cursor.execute('ALTER TABLE test ADD COLUMN answer_hash TEXT')
+
+
+def _migrate_progress_version(cursor):
+    # Номер версии агрегата progress: растет в каждой транзакции, меняющей агрегат (см. _touch_progress).
+    # origin отличает пересозданную БД, у которой счетчик начнется заново
+    cursor.execute('''
+                   CREATE TABLE progress_version (
+                                                           id      INTEGER PRIMARY KEY CHECK (id = 1),
+                                                           origin  TEXT    NOT NULL,
+                                                           version INTEGER NOT NULL
+                   )
+                   ''')
+    cursor.execute('INSERT INTO progress_version (id, origin, version) VALUES (1, ?, 0)', (uuid.uuid4().hex,))
+
+
+def _migrate_progress_day_index(cursor):
+    # Окно последних дат детальной таблицы выбирается по индексу (см. progress_day_from)
+    cursor.execute('CREATE INDEX IF NOT EXISTS progress_day ON progress (day)')
+
+
+# Миграции схемы по порядку; номер последней примененной хранится в PRAGMA user_version
+MIGRATIONS = [
+    _migrate_indexes,
+    _migrate_progress,
+    _migrate_day_keys,
+    _migrate_timings,
+    _migrate_day_index,
+    _migrate_answer_hash,
+    _migrate_progress_version,
+    _migrate_progress_day_index,
+]
+
+
+def _ensure_schema(connection):
+    """Создает таблицу и применяет недостающие миграции."""
+    connection.execute('''
                        CREATE TABLE IF NOT EXISTS test (
                                                            date_time   DATETIME,
                                                            task_number BIGINT,
@@ -87,269 +572,590 @@ def create_new_db():
                                                            result      INTEGER
                        )
                        ''')
+    if connection.execute('PRAGMA user_version').fetchone()[0] >= len(MIGRATIONS):
+        return
+    connection.execute('BEGIN IMMEDIATE')
+    try:
+        cursor = connection.cursor()
+        # Перечитываем версию под блокировкой: миграцию мог уже выполнить другой процесс
+        version = cursor.execute('PRAGMA user_version').fetchone()[0]
+        for migration in MIGRATIONS[version:]:
+            migration(cursor)
+        cursor.execute(f'PRAGMA user_version = {len(MIGRATIONS)}')
+        connection.execute('COMMIT')
+    except Exception:
+        connection.execute('ROLLBACK')
+        raise
+
+
+def open_database(path):
+    """Открывает БД результатов по пути path: режим WAL, таймаут блокировки, актуальная схема."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # isolation_level=None — транзакциями управляем сами (см. transaction)
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT_MS / 1000,
+                                 isolation_level=None, check_same_thread=False)
+    connection.execute(f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}')
+    connection.execute('PRAGMA journal_mode = WAL')
+    connection.execute('PRAGMA synchronous = NORMAL')
+    _ensure_schema(connection)
+    return connection
+
+
+def get_connection():
+    """
+    Возвращает общее для процесса соединение с БД (режим WAL, таймаут ожидания блокировки).
+    Соединение открывается заново, если поменялся путь к БД или процесс был форкнут.
+    """
+    global _connection, _connection_key
+    key = (db_path(), os.getpid())
+    if _connection is None or _connection_key != key:
+        _connection, _connection_key = open_database(key[0]), key
+    return _connection
 
 
-def add_result(date_time, task_number, task_type, result):
-    if not os.path.exists(db_path()):
-        create_new_db()
-    with sqlite3.connect(db_path()) as connection:
-        cursor = connection.cursor()
-        # Проверяем, есть ли уже запись с таким task_number и task_type
-        existing = get_result(task_number, task_type)
-        
-        # Если запись существует и последний результат был правильным (1), не добавляем новую запись
-        if existing and existing[3] == 1:
-            return  # Не добавляем дубликат правильного ответа
-        
-        # В остальных случаях добавляем новую запись
-        cursor.execute('INSERT INTO test (date_time, task_number, task_type, result) VALUES (?, ?, ?, ?)',
-                       (date_time, task_number, task_type, result))
+@atexit.register
+def close_connection():
+    """
+    Закрывает общее соединение с БД (например, перед удалением или копированием файла БД).
+    При закрытии журнал WAL сливается в result.db, поэтому вызывается и при выходе из процесса.
+    """
+    global _connection, _connection_key
+    if _connection is not None and _connection_key[1] == os.getpid():
+        _connection.close()
+    _connection = None
+    _connection_key = None
+
+
+class transaction:
+    """
+    Контекстный менеджер записи: BEGIN IMMEDIATE сразу берет блокировку на запись,
+    поэтому параллельно запущенные скрипты не перемешивают проверку и вставку.
+    """
+
+    def __enter__(self):
+        self.connection = get_connection()
+        self.connection.execute('BEGIN IMMEDIATE')
+        return self.connection.cursor()
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.connection.execute('COMMIT')
+        else:
+            self.connection.execute('ROLLBACK')
+        return False
+
+
+def create_new_db():
+    get_connection()
+
+
+def insert_result(cursor, date_time, task_number, task_type, result, answer_hash=None):
+    """
+    Добавляет запись и учитывает ее в агрегате progress — внутри уже открытой транзакции.
+    answer_hash — md5 присланного ответа (см. answer_digest), если он известен.
+    Если уже есть правильный ответ на это задание, запись не добавляется; возвращает, добавлена ли она.
+    """
+    day, timestamp = date_keys(date_time)
+    cursor.execute(INSERT_RESULT_SQL,
+                   (date_time, task_number, task_type, result, day, timestamp, answer_hash, task_type, task_number))
+    if cursor.rowcount != 1:
+        return False
+    _update_progress(cursor, day, task_number, task_type, result)
+    return True
+
+
+def add_result(date_time, task_number, task_type, result, answer_hash=None):
+    # Если уже есть правильный ответ на это задание, новая запись не добавляется
+    with transaction() as cursor:
+        insert_result(cursor, date_time, task_number, task_type, result, answer_hash)
+
+
+def add_results(rows):
+    """
+    Записывает пачку результатов (date_time, task_number, task_type, result[, answer_hash])
+    одной транзакцией. Правило то же, что и в add_result: правильный ответ повторно не дублируется.
+    """
+    with transaction() as cursor:
+        for row in rows:
+            insert_result(cursor, *row)
+
+
+def rebuild_progress(cursor=None):
+    """
+    Пересчитывает агрегат progress по всей истории — после правки записей таблицы test в обход
+    insert_result. cursor — курсор уже открытой транзакции; без него открывается своя.
+    """
+    if cursor is None:
+        with transaction() as cursor:
+            _rebuild_progress(cursor)
+    else:
+        _rebuild_progress(cursor)
+
+
+def ensure_indexes(cursor=None):
+    """
+    Создает недостающие индексы таблицы test (например, после DROP INDEX).
+    cursor — курсор уже открытой транзакции; без него открывается своя.
+    """
+    if cursor is None:
+        with transaction() as cursor:
+            _migrate_indexes(cursor)
+    else:
+        _migrate_indexes(cursor)
 
 
 def update_result(date_time, task_number, task_type, result):
-    with sqlite3.connect(db_path()) as connection:
-        cursor = connection.cursor()
-        cursor.execute('UPDATE test SET date_time = ?, result = ? WHERE task_type = ? AND task_number = ?',
-                       (date_time, result, task_type, task_number))
+    # OR IGNORE: не нарушаем ограничение «один правильный ответ на задание»
+    with transaction() as cursor:
+        day, timestamp = date_keys(date_time)
+        cursor.execute('UPDATE OR IGNORE test SET date_time = ?, result = ?, day = ?, timestamp = ? '
+                       'WHERE task_type = ? AND task_number = ?',
+                       (date_time, result, day, timestamp, task_type, task_number))
+        _rebuild_progress(cursor, task_type, task_number)
 
 
 def get_result(task_number, task_type):
-    with sqlite3.connect(db_path()) as connection:
-        cursor = connection.cursor()
-        cursor.execute('SELECT * FROM test WHERE task_number = ? AND task_type = ?',
-                       (task_number, task_type))
-        return cursor.fetchone()
+    cursor = get_connection().cursor()
+    cursor.execute('SELECT date_time, task_number, task_type, result FROM test WHERE task_number = ? AND task_type = ?',
+                   (task_number, task_type))
+    return cursor.fetchone()
 
 
 def get_results():
-    with sqlite3.connect(db_path()) as connection:
-        cursor = connection.cursor()
-        cursor.execute('SELECT * FROM test')
-        return cursor.fetchall()
+    cursor = get_connection().cursor()
+    cursor.execute('SELECT date_time, task_number, task_type, result FROM test')
+    return cursor.fetchall()
 
-def show_detailed_progress_table():
+
+def get_progress(task_type=None, day_from=None, day_before=None):
     """
-    Создает таблицу, где:
-    - По горизонтали расположены типы заданий (1-27)
-    - По вертикали расположены даты решения
-    - На пересечении отображаются номера заданий с цветовой индикацией правильности решения
+    Возвращает агрегат для графиков: строки (task_type, day, task_number, attempts, correct, last_result),
+    где day — номер дня от 1970-01-01.
+    Размер — число различных ячеек (тип, дата, номер), а не вся история.
+    Фильтры выполняет SQLite по индексам: task_type, day_from <= day < day_before (None — без границы).
     """
-    results = get_results()
+    conditions, params = [], []
+    for condition, value in (('task_type = ?', task_type), ('day >= ?', day_from), ('day < ?', day_before)):
+        if value is not None:
+            conditions.append(condition)
+            params.append(int(value))
+    where = (' WHERE ' + ' AND '.join(conditions)) if conditions else ''
+    cursor = get_connection().cursor()
+    cursor.execute('SELECT task_type, day, task_number, attempts, correct, last_result FROM progress' + where, params)
+    return cursor.fetchall()
+
+
+def progress_day_from(dates, task_type=None):
+    """
+    Номер самого раннего из последних dates различных дней в агрегате (или только у типа task_type).
+    None, если различных дней меньше dates: граница не нужна.
+    """
+    if task_type is None:
+        row = get_connection().execute('SELECT DISTINCT day FROM progress ORDER BY day DESC LIMIT 1 OFFSET ?',
+                                       (int(dates) - 1,)).fetchone()
+    else:
+        row = get_connection().execute('SELECT DISTINCT day FROM progress WHERE task_type = ? '
+                                       'ORDER BY day DESC LIMIT 1 OFFSET ?',
+                                       (int(task_type), int(dates) - 1)).fetchone()
+    return row[0] if row else None
+
+
+def solved_cells(task_type, limit):
+    """Число ячеек типа task_type с верным ответом, но не больше limit (чтение останавливается на limit)."""
+    return get_connection().execute('SELECT count(*) FROM (SELECT 1 FROM progress '
+                                    'WHERE task_type = ? AND correct > 0 LIMIT ?)',
+                                    (int(task_type), int(limit))).fetchone()[0]
+
+def show_detailed_progress_table():
+    """Детальная таблица прогресса (см. tests/charts.py). Matplotlib загружается только здесь."""
+    from . import charts
+    return charts.show_detailed_progress_table()
 
-    if not results:
-        fig, ax = plt.subplots(figsize=(12, 5))
-        ax.text(0.5, 0.5, "Нет данных для отображения", ha='center', va='center', fontsize=14)
-        ax.set_axis_off()
-        return fig
 
-    # Группируем результаты по дате и типу задания
-    # date -> task_type -> task_number -> result
-    date_type_task_result = defaultdict(lambda: defaultdict(dict))
+def show_common_progress():
+    """Гистограмма общего прогресса (см. tests/charts.py). Matplotlib загружается только здесь."""
+    from . import charts
+    return charts.show_common_progress()
 
-    # Собираем все уникальные даты и типы заданий
-    all_dates = set()
-    all_types = set()
 
-    for dt, task_number, task_type, result in results:
-        # Нормализация результата к 0/1
-        try:
-            r = int(result)
-            r = 1 if r == 1 else 0
-        except Exception:
+def answer_digest(result):
+    """md5-хеш ответа — в том виде, в котором его сравнивают с эталоном и хранят в БД."""
+    return hashlib.md5(str(result).encode()).hexdigest()
+
+
+def check_result(result, right_result):
+    """Сравнивает md5-хеш ответа с эталонным. Возвращает 1 (верно) или 0 (неверно)."""
+    return 1 if answer_digest(result) == right_result else 0
+
+
+# Имя файла задания: необязательный префикс '+'/'-', номер и расширение
+TASK_FILE_RE = re.compile(r'^([+-]?)Задание (\d+)(\.[^.]+)$')
+
+# Порядок выбора, если у задания одновременно есть файлы с разными префиксами
+TASK_FILE_PREFIXES = ('', '+', '-')
+
+# Кеш папок заданий: task_type -> путь к папке "Задания"
+_task_dirs = {}
+# Кеш содержимого папок: путь -> (mtime папки, {номер: {расширение: {префикс: имя файла}}})
+_task_index = {}
+
+
+def find_task_dir(task_type):
+    """Папка с файлами заданий типа task_type: "Тема {t}/Задания" или "ЕГЭ/Тема {t}/Задания"."""
+    t = int(task_type)
+    if t in _task_dirs and _task_dirs[t][0] == repo_root():
+        return _task_dirs[t][1]
+    # Строим путь относительно корня репозитория, отталкиваясь от текущего файла tests/conftest.py
+    for task_dir in (os.path.join(repo_root(), f"Тема {t}", "Задания"),
+                     os.path.join(repo_root(), "ЕГЭ", f"Тема {t}", "Задания")):
+        if os.path.isdir(task_dir):
+            _task_dirs[t] = (repo_root(), task_dir)
+            return task_dir
+    return None
+
+
+def task_dir_index(task_dir):
+    """
+    Индекс файлов заданий в папке: {номер: {расширение: {префикс: имя файла}}}.
+    Строится одним проходом os.scandir и перестраивается, только если изменилось mtime папки.
+    """
+    mtime = os.stat(task_dir).st_mtime_ns
+    cached = _task_index.get(task_dir)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    index = {}
+    with os.scandir(task_dir) as entries:
+        for entry in entries:
+            match = TASK_FILE_RE.match(entry.name)
+            if match and entry.is_file():
+                prefix, number, ext = match.groups()
+                index.setdefault(int(number), {}).setdefault(ext, {})[prefix] = entry.name
+    _task_index[task_dir] = (mtime, index)
+    return index
+
+
+def task_files(task_type, number):
+    """Все файлы задания (любые префиксы и расширения) — список полных путей."""
+    task_dir = find_task_dir(task_type)
+    if task_dir is None:
+        return []
+    by_ext = task_dir_index(task_dir).get(int(number), {})
+    return [os.path.join(task_dir, name)
+            for ext in sorted(by_ext)
+            for prefix in TASK_FILE_PREFIXES if prefix in by_ext[ext]
+            for name in [by_ext[ext][prefix]]]
+
+
+def _index_renamed(task_dir, number, ext, old_prefix, new_prefix):
+    """
+    Отражает переименование в кеше без повторного сканирования папки.
+    os.replace убирает только старое имя (и перезаписывает новое): файлы с третьим префиксом остаются.
+    """
+    cached = _task_index.get(task_dir)
+    if cached is None:
+        return
+    names = cached[1].setdefault(number, {}).setdefault(ext, {})
+    names.pop(old_prefix, None)
+    names[new_prefix] = f"{new_prefix}Задание {number}{ext}"
+    _task_index[task_dir] = (os.stat(task_dir).st_mtime_ns, cached[1])
+
+
+def mark_task_files(task_type, number, is_correct):
+    """
+    Ищет файлы задания (.md и .png и пр.) и переименовывает, добавляя префикс '+' или '-'.
+    С PROGRESS_STUDENT ничего не делает: файлы заданий общие для класса, и вердикт одного ученика
+    не должен менять их для остальных — статус ученика хранится только в его БД и картинках.
+    """
+    if student_name():
+        return []
+    try:
+        t = int(task_type)
+        n = int(number)
+    except Exception:
+        return []
+
+    task_dir = find_task_dir(t)
+    if task_dir is None:
+        return []
+    by_ext = task_dir_index(task_dir).get(n, {})
+
+    # Список поддерживаемых расширений файлов
+    extensions = ['.md', '.png', '.py', '.jpg', '.ods', '.xlsx']
+    sign = '+' if is_correct else '-'
+    renamed = []
+
+    for ext in extensions:
+        names = by_ext.get(ext)
+        if not names:
             continue
+        base_name = f"Задание {n}{ext}"
+        # Кандидаты: без префикса и с обоими префиксами
+        src_prefix = next(prefix for prefix in TASK_FILE_PREFIXES if prefix in names)
+        src = os.path.join(task_dir, names[src_prefix])
 
-        # Преобразуем дату в объект date
-        date_only = None
+        dst = os.path.join(task_dir, sign + base_name)
         try:
-            date_only = datetime.fromisoformat(str(dt)).date()
-        except Exception:
-            try:
-                ts = float(dt)
-                date_only = datetime.fromtimestamp(ts).date()
-            except Exception:
-                continue
-
-        # Сохраняем только последний результат для каждого задания на каждую дату
-        date_type_task_result[date_only][int(task_type)][int(task_number)] = r
-        all_dates.add(date_only)
-        all_types.add(int(task_type))
-
-    # Сортируем даты и типы заданий
-    sorted_dates = sorted(all_dates, reverse=True)  # Последние даты сверху
-    sorted_types = sorted(all_types)  # Типы заданий по порядку
-
-    # Создаем фигуру и оси
-    fig, ax = plt.subplots(figsize=(15, max(5, len(sorted_dates) * 0.4)))
-
-    # Создаем цветовую карту: красный для неверных, зеленый для верных, серый для отсутствующих
-    cmap = ListedColormap(['#ffcccc', '#ccffcc'])  # Светло-красный, светло-зеленый
-
-    # Создаем сетку для таблицы
-    table_data = np.zeros((len(sorted_dates), len(sorted_types)))
-    table_data.fill(np.nan)  # Заполняем NaN для отсутствующих данных
-
-    # Словарь для хранения текста ячеек
-    cell_texts = {}
-
-    # Заполняем данные для таблицы
-    for i, date in enumerate(sorted_dates):
-        for j, task_type in enumerate(sorted_types):
-            if task_type in date_type_task_result[date]:
-                # Собираем все задания данного типа на эту дату
-                tasks = date_type_task_result[date][task_type]
-                if tasks:
-                    # Вычисляем средний результат для отображения цвета ячейки
-                    avg_result = sum(tasks.values()) / len(tasks)
-                    table_data[i, j] = avg_result
-
-                    # Формируем текст ячейки: номера заданий с индикацией правильности
-                    task_texts = []
-                    for task_num, res in sorted(tasks.items()):
-                        # Добавляем номер задания с символом + или - в зависимости от результата
-                        symbol = "+" if res == 1 else "-"
-                        task_texts.append(f"{symbol}{task_num}")
-
-                    cell_texts[(i, j)] = "\n".join(task_texts)
-
-    # Создаем таблицу
-    im = ax.imshow(table_data, cmap=cmap, aspect='auto', interpolation='none', alpha=0.7)
-
-    # Добавляем текст в ячейки
-    for i in range(len(sorted_dates)):
-        for j in range(len(sorted_types)):
-            if (i, j) in cell_texts:
-                ax.text(j, i, cell_texts[(i, j)], ha='center', va='center', fontsize=8)
-
-    # Настраиваем оси
-    ax.set_xticks(np.arange(len(sorted_types)))
-    ax.set_yticks(np.arange(len(sorted_dates)))
-    ax.set_xticklabels([f"{t}" for t in sorted_types])
-    ax.set_yticklabels([date.strftime('%Y-%m-%d') for date in sorted_dates])
-    ax.xaxis.set_tick_params(top=True, bottom=False, labeltop=True, labelbottom=False)
-
-    # Добавляем сетку для лучшей читаемости
-    ax.set_xticks(np.arange(-.5, len(sorted_types), 1), minor=True)
-    ax.set_yticks(np.arange(-.5, len(sorted_dates), 1), minor=True)
-    ax.grid(which="minor", color="w", linestyle='-', linewidth=2)
-
-    # Добавляем заголовок и легенду
-    ax.set_title("Детальный прогресс по заданиям")
-
-    # Создаем легенду
-    red_patch = mpatches.Patch(color='#ffcccc', label='Неверно')
-    green_patch = mpatches.Patch(color='#ccffcc', label='Верно')
-    ax.legend(handles=[red_patch, green_patch], loc='upper right')
-
-    # Настраиваем размер фигуры и отступы
-    plt.tight_layout()
-
-    return fig
+            if os.path.abspath(src) != os.path.abspath(dst):
+                os.replace(src, dst)  # перезаписываем, если существует файл с другим префиксом
+                stage_file(src)  # удаление старого имени тоже попадет в коммит
+                _index_renamed(task_dir, n, ext, src_prefix, sign)
+            # Файл индексируем и без переименования: ученик мог исправить решение, не поменяв статус
+            stage_file(dst)
+            renamed.append(dst)
 
-def show_common_progress():
+        except Exception as e:
+            print(f"Ошибка при переименовании файла: {str(e)}")
+
+    return renamed
+
+
+# Формат картинок прогресса: 'svg' — легкий построитель без matplotlib (svg_charts.py),
+# 'png' — matplotlib (charts.py). Настраивается через PROGRESS_CHART_FORMAT
+CHART_FORMAT = os.environ.get('PROGRESS_CHART_FORMAT', 'svg').lower()
+if CHART_FORMAT not in ('svg', 'png'):
+    # Опечатка в настройке не должна ломать task-скрипты: они импортируют модуль ради проверки ответа
+    print(f"Предупреждение: PROGRESS_CHART_FORMAT={CHART_FORMAT!r} не поддерживается "
+          f"(ожидается 'svg' или 'png'), используется 'svg'")
+    CHART_FORMAT = 'svg'
+
+
+def chart_backend():
+    """Модуль построения графиков для CHART_FORMAT; импортируется лениво."""
+    if CHART_FORMAT == 'png':
+        from . import charts
+        return charts
+    from . import svg_charts
+    return svg_charts
+
+
+def chart_paths():
+    """Пути к картинкам прогресса и к файлу с отпечатком данных, по которым они построены."""
+    return (os.path.join(data_dir(), f'common_progress.{CHART_FORMAT}'),
+            os.path.join(data_dir(), f'detailed_progress.{CHART_FORMAT}'),
+            os.path.join(data_dir(), 'progress.fingerprint'))
+
+
+def detailed_page_path(page):
+    """Путь к странице детальной таблицы: первая — detailed_progress.svg, далее detailed_progress_2.svg..."""
+    if page == 1:
+        return chart_paths()[1]
+    return os.path.join(data_dir(), f'detailed_progress_{page}.{CHART_FORMAT}')
+
+
+def progress_fingerprint():
     """
-    Получить из БД все разультаты и сгруппировать их по полю task_type.
-    Для каждого типа посчитать процент правильных ответов среди всех решенных заданий данного типа,
-    в подсчёт включаются только данные за последние 5 дат.
-    При этом необходимо находить среднее значение по каждому номеру задания (task_number).
-    Построить гистограмму, где на оси X будут номера тем, а на Y — процент правильных ответов.
+    Отпечаток входных данных графиков: версия агрегата progress (см. _touch_progress), код построения
+    графиков и настройки окна детальной таблицы. Если он не изменился, картинки получились бы теми же самыми.
+    Из БД читается одна строка, поэтому стоимость не зависит от размера истории.
     """
-    from collections import defaultdict
+    digest = hashlib.sha256()
+    tests_dir = os.path.join(repo_root(), 'tests')
+    for name in ('progress.py', 'charts.py', 'svg_charts.py'):
+        with open(os.path.join(tests_dir, name), 'rb') as f:
+            digest.update(f.read())
+    digest.update(f'format={CHART_FORMAT};'.encode())
+    for name in ('PROGRESS_TABLE_DAYS', 'PROGRESS_TABLE_PAGES'):
+        digest.update(f'{name}={os.environ.get(name, "")};'.encode())
+    origin, version = get_connection().execute('SELECT origin, version FROM progress_version').fetchone()
+    digest.update(f'progress={origin}:{version};'.encode())
+    return digest.hexdigest()
+
+
+def progress_is_current():
+    """Возвращает (актуальны ли картинки, текущий отпечаток данных)."""
+    fig_path, detail_fig_path, fingerprint_path = chart_paths()
+    fingerprint = progress_fingerprint()
+    try:
+        with open(fingerprint_path, encoding='utf-8') as f:
+            saved = f.read().strip()
+    except FileNotFoundError:
+        return False, fingerprint
+    current = saved == fingerprint and os.path.exists(fig_path) and os.path.exists(detail_fig_path)
+    return current, fingerprint
 
-    results = get_results()
 
-    # type -> date -> task_number -> list[result]
-    type_date_task_values = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+# Отпечаток только что нарисованных графиков: (путь, отпечаток). Записывается в файл
+# после успешного коммита (см. commit_staged) — иначе неудачный коммит больше не повторился бы
+_unsaved_fingerprint = None
 
-    for dt, task_number, task_type, result in results:
-        # Нормализация результата к 0/1, некорректные значения/строки пропускаем
-        try:
-            r = int(result)
-            r = 1 if r == 1 else 0
-        except Exception:
-            continue
 
-        # Преобразуем дату в объект date (сначала ISO, затем timestamp для обратной совместимости)
-        date_only = None
-        try:
-            date_only = datetime.fromisoformat(str(dt)).date()
-        except Exception:
-            try:
-                ts = float(dt)
-                date_only = datetime.fromtimestamp(ts).date()
-            except Exception:
-                continue
-
-        type_date_task_values[int(task_type)][date_only][int(task_number)].append(r)
-
-    # Считаем процент по каждому типу: берём последние 5 дат, считаем среднее по каждому task_number,
-    # затем усредняем по task_number и переводим в проценты
-    x_types = list(range(1, 28))  # 1..27
-    percentages = []
-
-    for t in x_types:
-        date_map = type_date_task_values.get(t, {})
-        if not date_map:
-            percentages.append(0.0)
-            continue
+def _save_fingerprint():
+    global _unsaved_fingerprint
+    if _unsaved_fingerprint is not None:
+        fingerprint_path, fingerprint = _unsaved_fingerprint
+        with open(fingerprint_path, 'w', encoding='utf-8') as f:
+            f.write(fingerprint + '\n')
+    _unsaved_fingerprint = None
 
-        last_dates = sorted(date_map.keys(), reverse=True)[:5]
-        if not last_dates:
-            percentages.append(0.0)
-            continue
 
-        task_to_values = defaultdict(list)
-        for d in last_dates:
-            for task_num, vals in date_map[d].items():
-                task_to_values[task_num].extend(vals)
+def _discard_fingerprint():
+    global _unsaved_fingerprint
+    _unsaved_fingerprint = None
 
-        if not task_to_values:
-            percentages.append(0.0)
-            continue
 
-        per_task_means = []
-        for vals in task_to_values.values():
-            if len(vals) > 0:
-                per_task_means.append(sum(vals) / len(vals))
-
-        percent = (sum(per_task_means) / len(per_task_means)) * 100 if per_task_means else 0.0
-        
-        # Рассчитываем коэффициент на основе ВСЕ когда-либо решённых заданий данного типа
-        # Считаем общее количество верно решённых заданий для данного типа из всех дат
-        total_correct_count = 0
-        for date_data in type_date_task_values[t].values():
-            for vals in date_data.values():
-                # Каждое задание (task_number) считается один раз, берём его максимальное значение
-                if len(vals) > 0 and max(vals) == 1.0:
-                    total_correct_count += 1
-        
-        # Применяем коэффициент на основе общего количества верно решённых заданий
-        if total_correct_count < 10:
-            coefficient = (total_correct_count * 10) / 100.0  # 10% за каждое верное задание
-        else:
-            coefficient = 1.0  # 100% для 10 и более
-        
-        percent = percent * coefficient
-        percentages.append(percent)
-
-    # Построение гистограммы
-    fig, ax = plt.subplots(figsize=(12, 5))
-    norm = Normalize(vmin=0, vmax=100)
-    # Цветовая схема
-    cmap = LinearSegmentedColormap.from_list("red_green", ["red", "orange", "green"])
-    colors = cmap(norm(percentages))
-    bars = ax.bar(x_types, percentages, color=colors)
-    # ---
-    for bar, val in zip(bars, percentages):
-        ax.text(bar.get_x() + bar.get_width() / 2, bar.get_height() / 2,
-                f"{val:.1f}", ha='center', va='center', color='black')
-
-    ax.set_xlabel('Номер темы')
-    ax.set_ylabel('Показатель успеваемости')
-    ax.set_title('Общий прогресс')
-    ax.set_xticks(x_types)
-    ax.set_ylim(0, 100)
-
-    return fig
+def render_progress(force=False):
+    """
+    Строит и сохраняет оба графика прогресса, добавляет их в Git. Возвращает пути к картинкам.
+    Если данные не изменились с прошлой отрисовки (см. progress_fingerprint), ничего не делает
+    и возвращает пустой список; force=True перерисовывает в любом случае.
+    Отпечаток сохраняется только после успешного коммита картинок (commit_staged).
+    """
+    with span('fingerprint'):
+        current, fingerprint = progress_is_current()
+    if current and not force:
+        return []
+    return _render_charts(fingerprint)
+
+
+def _render_charts(fingerprint):
+    global _unsaved_fingerprint
+    with span('import'):
+        charts = chart_backend()
+        from .progress import chart_columns
+
+    fig_path, _, fingerprint_path = chart_paths()
+    # Ячейки обоих графиков читаются из БД один раз и только в пределах их окон дат
+    with span('sqlite'):
+        columns, solved = chart_columns()
+    with span('render'):
+        fig = charts.show_common_progress(columns, solved)
+    with span('savefig'):
+        charts.save_figure(fig, fig_path)
+    paths = [fig_path]
+
+    # Создаем и сохраняем детальную таблицу прогресса (по страницам)
+    with span('render'):
+        pages = charts.detailed_progress_pages(columns=columns)
+    for page, detail_fig in enumerate(pages, start=1):
+        paths.append(detailed_page_path(page))
+        with span('savefig'):
+            charts.save_figure(detail_fig, paths[-1])
+
+    # Страницы, которых больше нет (история короче или сменилась настройка), удаляем
+    stale = []
+    page = len(pages) + 1
+    while os.path.exists(detailed_page_path(page)):
+        os.remove(detailed_page_path(page))
+        stale.append(detailed_page_path(page))
+        page += 1
+
+    _unsaved_fingerprint = (fingerprint_path, fingerprint)
+
+    # Добавляем график прогресса в Git (вместе с остальными файлами регистрации, см. commit_staged)
+    for path in paths + stale:
+        stage_file(path)
+    return paths
+
+
+# Режим отрисовки графиков: 'sync' — сразу внутри result_register,
+# 'async' — в отдельном фоновом процессе (см. tests/render_worker.py)
+RENDER_MODE = os.environ.get('PROGRESS_RENDER', 'sync')
+
+
+def publish_progress(message):
+    """
+    Перерисовывает графики и создает коммит — сразу или в фоне, в зависимости от RENDER_MODE.
+    Если история не изменилась и файлы заданий совпадают с закоммиченными,
+    не запускает ни git add, ни git commit.
+    """
+    with span('fingerprint'):
+        current, fingerprint = progress_is_current()
+    if current:
+        drop_unchanged_staged()
+        if not _staged_paths:
+            return
+    # Фоновый процесс нужен только если графики действительно придется перерисовать
+    if RENDER_MODE == 'async' and not current:
+        from .render_worker import request_render
+        # Переименованные файлы индексирует фоновый процесс вместе с графиками, под блокировкой
+        # коммита: git add отсюда мог бы столкнуться с его index.lock
+        request_render(message, take_staged())
+        return
+
+    if not current:
+        _render_charts(fingerprint)
+    commit_staged(message)
+
+
+# Активная пачка регистраций (см. registration_batch). None — регистрация выполняется сразу.
+_current_batch = None
+
+
+class RegistrationBatch:
+    """
+    Накопитель регистраций ответов.
+    Пока пачка открыта, result_register только проверяет ответ и ставит его в очередь.
+    При закрытии: одна транзакция в БД, по одному переименованию файлов на задание,
+    одна отрисовка графиков и один коммит на всю пачку.
+    """
+
+    def __init__(self, commit_message=None):
+        self.commit_message = commit_message
+        self.items = []  # (date_time, number, task_type, res, answer_hash)
+
+    def add(self, task_type, number, result, right_result):
+        res = check_result(result, right_result)
+        self.items.append((datetime.now().isoformat(), number, task_type, res, answer_digest(result)))
+        return "Верно" if res else "Неверно"
+
+    def flush(self):
+        """Выполняет все накопленные регистрации. Возвращает количество обработанных ответов."""
+        items, self.items = self.items, []
+        if not items:
+            return 0
+
+        with span('total'):
+            with span('sqlite'):
+                add_results(items)
+
+            # Файлы каждого задания переименовываем один раз — по последнему ответу
+            last_verdicts = {}
+            for _, number, task_type, res, _ in items:
+                last_verdicts[(task_type, number)] = res
+            with span('rename'):
+                for (task_type, number), res in last_verdicts.items():
+                    mark_task_files(task_type, number, res == 1)
+
+            correct = sum(res for _, _, _, res, _ in items)
+            publish_progress(self.commit_message or (
+                f"Обновлен статус заданий: {len(items)} ответов, верно {correct}, неверно {len(items) - correct}"))
+        report_spans(f"пачка из {len(items)} ответов")
+        return len(items)
+
+    def __enter__(self):
+        global _current_batch
+        self._previous = _current_batch
+        _current_batch = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        global _current_batch
+        _current_batch = self._previous
+        # Уже проверенные ответы сохраняем даже при исключении внутри блока
+        self.flush()
+        return False
+
+
+def registration_batch(commit_message=None):
+    """
+    Контекстный менеджер для пакетной регистрации:
+
+        with registration_batch():
+            result_register(7, 7, 64, '...')
+            result_register(7, 16, 10, '...')
+    """
+    return RegistrationBatch(commit_message)
+
+
+def register_many(items, commit_message=None):
+    """
+    Регистрирует список ответов [(task_type, number, result, right_result), ...] одной пачкой.
+    Возвращает список вердиктов "Верно"/"Неверно" в том же порядке.
+    """
+    with registration_batch(commit_message) as batch:
+        return [batch.add(*item) for item in items]
+
 
 def result_register(task_type, number, result, right_result):
     """
@@ -357,77 +1163,22 @@ def result_register(task_type, number, result, right_result):
     Оперделение пути файла проиходится через переменные task_type и number.
     Файлы располагаются в подпапке: Тема {task_type}/Задания/
     Имя файла: "Задание {number}.md" или "Задание {number}.png".
+    Внутри registration_batch() ответ только проверяется и ставится в очередь пачки.
     """
-    res = 1 if hashlib.md5(str(result).encode()).hexdigest() == right_result else 0
-    # Храним дату в читабельном ISO-формате
-    add_result(datetime.now().isoformat(), number, task_type, res)
-
-    def mark_task_files(task_type, number, is_correct):
-        """Ищет файлы задания (.md и .png и пр.) и переименовывает, добавляя префикс '+' или '-'"""
-        try:
-            t = int(task_type)
-            n = int(number)
-        except Exception:
-            return []
-
-        # Строим путь относительно корня репозитория, отталкиваясь от текущего файла tests/conftest.py
-        task_dir = os.path.join(repo_root(), f"Тема {t}", "Задания")
-
-        if not os.path.isdir(task_dir):
-            task_dir = os.path.join(repo_root(), "ЕГЭ", f"Тема {t}", "Задания")
-        if not os.path.isdir(task_dir):
-            return []
-
-        # Список поддерживаемых расширений файлов
-        extensions = ['.md', '.png', '.py', '.jpg', '.ods', '.xlsx']
-        sign = '+' if is_correct else '-'
-        renamed = []
-
-        for ext in extensions:
-            base_name = f"Задание {n}{ext}"
-            # Кандидаты: без префикса и с обоими префиксами
-            candidates = [
-                os.path.join(task_dir, base_name),
-                os.path.join(task_dir, '+' + base_name),
-                os.path.join(task_dir, '-' + base_name),
-            ]
-
-            src = None
-            for cand in candidates:
-                if os.path.exists(cand):
-                    src = cand
-                    break
-            if not src:
-                continue
-
-            dst = os.path.join(task_dir, sign + base_name)
-            try:
-                if os.path.abspath(src) != os.path.abspath(dst):
-                    os.replace(src, dst)  # перезаписываем, если существует файл с другим префиксом
-                renamed.append(dst)
-                success, message = git_add_file(dst)
-                if not success:
-                    print(f"Предупреждение при добавлении файла в Git: {message}")
-
-            except Exception as e:
-                print(f"Ошибка при переименовании файла: {str(e)}")
-
-        return renamed
-
-    mark_task_files(task_type, number, res == 1)
-    fig = show_common_progress()
-    fig_path = f'{repo_root()}/tests/common_progress.png'
-    fig.savefig(fig_path)
-
-    # Создаем и сохраняем детальную таблицу прогресса
-    detail_fig = show_detailed_progress_table()
-    detail_fig_path = f'{repo_root()}/tests/detailed_progress.png'
-    detail_fig.savefig(detail_fig_path)
-
-    # Добавляем график прогресса в Git и создаем коммит
-    git_add_file(fig_path)
-    git_add_file(detail_fig_path)
-    success_commit, message_commit = git_commit(f"Обновлен статус задания {number} темы {task_type}. Задание решено {("Верно" if res else "Неверно")}")
-    if not success_commit:
-        print(f"Предупреждение при создании коммита: {message_commit}")
-    return "Верно" if res else "Неверно"
\ No newline at end of file
+    if _current_batch is not None:
+        return _current_batch.add(task_type, number, result, right_result)
+
+    with span('total'):
+        with span('check'):
+            res = check_result(result, right_result)
+        # Храним дату в читабельном ISO-формате
+        with span('sqlite'):
+            add_result(datetime.now().isoformat(), number, task_type, res, answer_digest(result))
+
+        with span('rename'):
+            mark_task_files(task_type, number, res == 1)
+
+        # Графики и коммит с переименованными файлами
+        publish_progress(f"Обновлен статус задания {number} темы {task_type}. Задание решено {'Верно' if res else 'Неверно'}")
+    report_spans(f"задание {number} темы {task_type}")
+    return "Верно" if res else "Неверно"
@@ -0,0 +1,213 @@
+"""
+Решатель заданий Темы 4 ЕГЭ: условие Фано и минимальные коды для оставшихся букв.
+
+    from tests.fano import is_fano, minimal_completion
+    is_fano({'К': '01', 'Р': '001'})                             # True
+    minimal_completion('БАРАБАН', {'К': '01', 'Р': '001'}, 'АБКРН')
+    # (16, {'К': '01', 'Р': '001', 'А': '10', 'Б': '11', 'Н': '000'})
+
+Коды хранятся в двоичном боре: проверка условия Фано — один проход по всем кодам,
+O(суммарной длины). Свободные места в боре — вершины, с которых не начинается ни один
+известный код (free_roots); под каждой можно разместить любое префиксное поддерево.
+Длины кодов оставшихся букв подбираются динамикой по глубинам бора: на каждой глубине
+очередная самая частая буква либо получает код этой длины, либо все свободные вершины
+делятся и перебор переходит на следующую глубину. Обратное условие Фано (reverse=True) —
+то же самое для перевернутых кодов.
+"""
+from collections import Counter
+from functools import lru_cache
+
+
+def _items(codes, reverse):
+    pairs = codes.items() if isinstance(codes, dict) else ((code, code) for code in codes)
+    for key, code in pairs:
+        if not code or set(code) - {'0', '1'}:
+            raise ValueError(f"Код должен быть непустой строкой из 0 и 1: {code!r}")
+        yield key, code[::-1] if reverse else code
+
+
+def build_trie(codes, reverse=False):
+    """
+    Двоичный бор кодов: (children, owner), где children[v] = [сын по '0', сын по '1'] (None — нет),
+    owner[v] — буква (или код), которая заканчивается в вершине v. Вершина 0 — корень.
+    Возвращает также первую найденную пару (a, b), где a — начало b, или None.
+    """
+    children, owner = [[None, None]], [None]
+    conflict = None
+    for key, code in _items(codes, reverse):
+        v = 0
+        for bit in code:
+            if owner[v] is not None and conflict is None:
+                conflict = (owner[v], key)  # уже записанный код — начало нового
+            b = bit == '1'
+            if children[v][b] is None:
+                children[v][b] = len(children)
+                children.append([None, None])
+                owner.append(None)
+            v = children[v][b]
+        if conflict is None and (owner[v] is not None or children[v] != [None, None]):
+            # Новый код совпадает с записанным или является его началом
+            conflict = (key, owner[v] if owner[v] is not None else _any_owner(children, owner, v))
+        if owner[v] is None:
+            owner[v] = key
+    return children, owner, conflict
+
+
+def _any_owner(children, owner, v):
+    """Любой код в поддереве вершины v."""
+    stack = [v]
+    while stack:
+        u = stack.pop()
+        if owner[u] is not None:
+            return owner[u]
+        stack.extend(c for c in children[u] if c is not None)
+    return None
+
+
+def find_conflict(codes, reverse=False):
+    """
+    Нарушение условия Фано: пара (a, b), где код a — начало (reverse=True — окончание) кода b,
+    или None. codes — словарь {буква: код} (тогда в паре буквы) или список кодов.
+    """
+    return build_trie(codes, reverse)[2]
+
+
+def is_fano(codes, reverse=False):
+    """Выполняется ли прямое (reverse=True — обратное) условие Фано."""
+    return find_conflict(codes, reverse) is None
+
+
+def free_roots(codes, reverse=False):
+    """
+    Свободные вершины бора — коды, которые не являются ни началом, ни продолжением известных кодов
+    и минимальны по длине; любое префиксное множество кодов под ними совместимо с codes.
+    Возвращаются по возрастанию длины, затем числового значения (в прямой записи, даже при reverse).
+    """
+    children, owner, conflict = build_trie(codes, reverse)
+    if conflict is not None:
+        raise ValueError(f"Известные коды не удовлетворяют условию Фано: {conflict[0]} и {conflict[1]}")
+    if children[0] == [None, None]:
+        return ['0', '1']  # пустой код недопустим, поэтому свободны обе вершины первого уровня
+    roots = []
+    stack = [(0, '')]
+    while stack:
+        v, path = stack.pop()
+        if owner[v] is not None:
+            continue
+        for b in (0, 1):
+            if children[v][b] is None:
+                roots.append(path + str(b))
+            else:
+                stack.append((children[v][b], path + str(b)))
+    roots.sort(key=lambda code: (len(code), code))
+    return [code[::-1] for code in roots] if reverse else roots
+
+
+def completion_lengths(weights, root_depths):
+    """
+    Оптимальные длины кодов для букв с частотами weights (список), если свободны вершины
+    на глубинах root_depths. Возвращает (сумма частота * длина, длины в порядке weights).
+    """
+    order = sorted(range(len(weights)), key=lambda i: -weights[i])
+    prefix = [0]
+    for i in order:
+        prefix.append(prefix[-1] + weights[i])
+    letters = len(order)
+    free = Counter(root_depths)
+    max_depth = max(root_depths, default=0) + letters
+
+    @lru_cache(maxsize=None)
+    def best(depth, placed, available):
+        """
+        (стоимость, шаг) для оставшихся букв: шаг True — следующая буква получает код длины depth,
+        False — свободные вершины делятся и переходим на глубину depth + 1.
+        """
+        rest = letters - placed
+        if rest == 0:
+            return 0, False
+        if available >= rest:
+            # Вершин хватает всем — глубже опускаться только дороже
+            return depth * (prefix[letters] - prefix[placed]), True
+        if depth >= max_depth:
+            return float('inf'), False
+        deeper = best(depth + 1, placed, min(2 * available + free[depth + 1], rest))[0]
+        if available:
+            here = depth * weights[order[placed]] + best(depth, placed + 1, available - 1)[0]
+            if here <= deeper:
+                return here, True
+        return deeper, False
+
+    start = min(root_depths, default=1)
+    total, _ = best(start, 0, min(free[start], letters))
+    if total == float('inf'):
+        raise ValueError("Для оставшихся букв нет свободных кодов")
+    lengths = [0] * letters
+    depth, placed, available = start, 0, min(free[start], letters)
+    while placed < letters:
+        if available >= letters - placed:
+            for i in order[placed:]:
+                lengths[i] = depth
+            break
+        if best(depth, placed, available)[1]:
+            lengths[order[placed]] = depth
+            placed += 1
+            available -= 1
+        else:
+            depth += 1
+            available = min(2 * available + free[depth], letters - placed)
+    return total, lengths
+
+
+def minimal_completion(word, fixed, alphabet=None, reverse=False):
+    """
+    Коды минимальной суммарной длины для слова word, если коды букв fixed {буква: код} известны.
+    alphabet — все буквы сообщения (по умолчанию буквы слова и fixed); у букв, которых нет в слове,
+    тоже должен быть код. Возвращает (длина кода слова, {буква: код} для всего алфавита).
+    Из равноценных вариантов выбираются коды с минимальными числовыми значениями.
+    """
+    roots = free_roots(fixed, reverse)
+    return _complete(word, fixed, alphabet, reverse, roots)
+
+
+def _complete(word, fixed, alphabet, reverse, roots):
+    counts = Counter(word)
+    letters = sorted((set(alphabet or '') | set(counts)) - set(fixed), key=lambda c: (-counts[c], c))
+    _, lengths = completion_lengths([counts[c] for c in letters], [len(code) for code in roots])
+
+    # Раздаем конкретные коды: на каждой глубине — наименьшие свободные вершины, частым буквам первыми
+    codes = dict(fixed)
+    pending = sorted(zip(lengths, range(len(letters))))
+    available = []
+    forward = sorted((code[::-1] if reverse else code for code in roots), key=lambda code: (len(code), code))
+    depth = 0
+    while pending:
+        depth += 1
+        available = sorted(available + [code for code in forward if len(code) == depth])
+        taken = [i for length, i in pending if length == depth]
+        for code, i in zip(available, taken):
+            codes[letters[i]] = code[::-1] if reverse else code
+        available = available[len(taken):]
+        pending = [item for item in pending if item[0] != depth]
+        available = [code + bit for code in available for bit in '01'][:len(pending)]
+    total = sum(len(codes[c]) * n for c, n in counts.items())
+    return total, codes
+
+
+def minimal_length(word, fixed, alphabet=None, reverse=False):
+    """Минимальное число двоичных знаков в коде слова word (ответ заданий вида Задание 4)."""
+    return minimal_completion(word, fixed, alphabet, reverse)[0]
+
+
+def solve_many(queries, reverse=False):
+    """
+    Пакет запросов [(слово, fixed, alphabet), ...] -> [(длина, коды), ...].
+    Свободные вершины бора для одинаковых наборов известных кодов считаются один раз.
+    """
+    roots_cache = {}
+    results = []
+    for word, fixed, *alphabet in queries:
+        key = frozenset(fixed.items())
+        if key not in roots_cache:
+            roots_cache[key] = free_roots(fixed, reverse)
+        results.append(_complete(word, fixed, alphabet[0] if alphabet else None, reverse, roots_cache[key]))
+    return results
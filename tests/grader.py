@@ -0,0 +1,136 @@
+"""
+Массовая проверка task-скриптов ЕГЭ.
+
+    python -m tests.grader              # все задания
+    python -m tests.grader 7 11         # только темы 7 и 11
+    python -m tests.grader --dry-run    # только показать вердикты, ничего не записывать
+
+Каждый скрипт "Тема */Задания/*Задание N.py" выполняется в пуле процессов; вызов
+result_register внутри скрипта подменяется и только запоминает ответ и эталонный хеш.
+Затем все ответы проверяются и регистрируются одной пачкой (см. register_many):
+одна транзакция, одна отрисовка графиков и один коммит.
+"""
+import argparse
+import contextlib
+import io
+import os
+import re
+import runpy
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from tests import conftest
+from tests.conftest import check_result, find_task_dir, register_many, repo_root, task_dir_index
+
+# Папка темы: "Тема 7" (в корне репозитория или в папке ЕГЭ)
+TOPIC_DIR_RE = re.compile(r'^Тема (\d+)$')
+
+
+def topic_types():
+    """Номера тем, для которых есть папка с заданиями."""
+    types = set()
+    for base in (repo_root(), os.path.join(repo_root(), 'ЕГЭ')):
+        if not os.path.isdir(base):
+            continue
+        with os.scandir(base) as entries:
+            for entry in entries:
+                match = TOPIC_DIR_RE.match(entry.name)
+                if match and entry.is_dir():
+                    types.add(int(match.group(1)))
+    return sorted(t for t in types if find_task_dir(t))
+
+
+def discover_task_scripts(types=None):
+    """Список (тип, номер, путь) для всех task-скриптов выбранных тем."""
+    scripts = []
+    for t in types or topic_types():
+        task_dir = find_task_dir(t)
+        if task_dir is None:
+            continue
+        for number, by_ext in sorted(task_dir_index(task_dir).items()):
+            for prefix in conftest.TASK_FILE_PREFIXES:
+                if prefix in by_ext.get('.py', {}):
+                    scripts.append((t, number, os.path.join(task_dir, by_ext['.py'][prefix])))
+                    break
+    return scripts
+
+
+# Ответы, которые скрипт передал в result_register (заполняется в процессе пула)
+_captured = []
+
+
+def _capture_register(task_type, number, result, right_result):
+    _captured.append((task_type, number, str(result), right_result))
+    return "Верно" if check_result(result, right_result) else "Неверно"
+
+
+def _init_worker():
+    # Подменяем регистрацию только в процессах пула: скрипт импортирует уже подмененную функцию
+    conftest.result_register = _capture_register
+
+
+def run_task_script(path):
+    """Выполняет task-скрипт из его папки. Возвращает None или строку с описанием ошибки."""
+    cwd = os.getcwd()
+    try:
+        # Скрипты могут открывать свои файлы данных по относительному пути
+        os.chdir(os.path.dirname(path))
+        runpy.run_path(path, run_name='__main__')
+    except BaseException as e:
+        return f"{type(e).__name__}: {e}"
+    finally:
+        os.chdir(cwd)
+    return None
+
+
+def evaluate_script(path):
+    """
+    Выполняет task-скрипт и возвращает список его вызовов result_register
+    [(тип, номер, ответ, хеш)] или строку с ошибкой.
+    """
+    _captured.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        error = run_task_script(path)
+    return error if error else list(_captured)
+
+
+def grade(types=None, jobs=None, dry_run=False):
+    """
+    Проверяет все task-скрипты выбранных тем.
+    Возвращает список (тип, номер, путь, вердикт или описание ошибки).
+    """
+    scripts = discover_task_scripts(types)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) as pool:
+        outcomes = list(pool.map(evaluate_script, [path for _, _, path in scripts]))
+
+    report = []
+    items = []
+    for (t, number, path), outcome in zip(scripts, outcomes):
+        if isinstance(outcome, str):
+            report.append((t, number, path, f"Ошибка: {outcome}"))
+        elif not outcome:
+            report.append((t, number, path, "Нет ответа"))
+        else:
+            for item in outcome:
+                items.append(item)
+                report.append((item[0], item[1], path, "Верно" if check_result(item[2], item[3]) else "Неверно"))
+
+    if items and not dry_run:
+        register_many(items, commit_message=f"Массовая проверка заданий: {len(items)} ответов")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Массовая проверка task-скриптов ЕГЭ")
+    parser.add_argument('types', nargs='*', type=int, help="номера тем (по умолчанию все)")
+    parser.add_argument('-j', '--jobs', type=int, default=None, help="число процессов (по умолчанию — число ядер)")
+    parser.add_argument('--dry-run', action='store_true', help="не записывать результаты в БД и Git")
+    args = parser.parse_args(argv)
+
+    for t, number, path, verdict in grade(args.types or None, args.jobs, args.dry_run):
+        print(f"Тема {t}, задание {number}: {verdict}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+Потоковые выборки из истории результатов (таблица test) с фильтрами на стороне SQLite.
+
+    for row in iter_results(date_from='2025-11-01', task_types=[7, 11]):
+        ...
+
+Строки читаются порциями через fetchmany, поэтому память не зависит от размера истории.
+Для аналитики есть колоночная форма (query_columns — массивы модуля array) и потоковый
+экспорт/импорт CSV:
+
+    python -m tests.history export history.csv --from 2025-11-01 --types 7 11
+    python -m tests.history import history.csv
+"""
+import argparse
+import csv
+import sys
+from array import array
+from datetime import date, datetime
+
+from tests.conftest import date_to_day, get_connection, insert_result, normalize_result, transaction
+
+# Поля строки истории в порядке выдачи iter_results и столбцов CSV
+RESULT_FIELDS = ('date_time', 'task_number', 'task_type', 'result', 'day', 'timestamp', 'answer_hash')
+
+# Размер порции fetchmany
+CHUNK_SIZE = 10000
+
+
+def _day(value):
+    """Номер дня для границы диапазона: date, datetime или строка ISO."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        value = value.date()
+    if isinstance(value, date):
+        return date_to_day(value)
+    return int(value)
+
+
+def _where(date_from=None, date_to=None, task_types=None, task_numbers=None):
+    """Условие WHERE и параметры для фильтров (границы дат включительно)."""
+    conditions, params = [], []
+    if date_from is not None:
+        conditions.append('day >= ?')
+        params.append(_day(date_from))
+    if date_to is not None:
+        conditions.append('day <= ?')
+        params.append(_day(date_to))
+    for column, values in (('task_type', task_types), ('task_number', task_numbers)):
+        if values is not None:
+            values = [int(v) for v in values]
+            conditions.append(f"{column} IN ({', '.join('?' * len(values))})" if values else '0')
+            params.extend(values)
+    return (' WHERE ' + ' AND '.join(conditions)) if conditions else '', params
+
+
+def _select(fields, date_from, date_to, task_types, task_numbers, latest_only):
+    where, params = _where(date_from, date_to, task_types, task_numbers)
+    sql = f"SELECT {', '.join(fields)} FROM test"
+    if latest_only:
+        # Последняя запись по каждому заданию среди подходящих под фильтры
+        sql += f" WHERE rowid IN (SELECT MAX(rowid) FROM test{where} GROUP BY task_type, task_number)"
+    else:
+        sql += where
+    return sql + ' ORDER BY rowid', params
+
+
+def iter_results(date_from=None, date_to=None, task_types=None, task_numbers=None, latest_only=False,
+                 chunk_size=CHUNK_SIZE):
+    """
+    Генератор строк истории (см. RESULT_FIELDS) в порядке добавления.
+    date_from/date_to — границы по дате записи включительно; task_types/task_numbers — списки значений;
+    latest_only — только последняя запись по каждому заданию.
+    """
+    sql, params = _select(RESULT_FIELDS, date_from, date_to, task_types, task_numbers, latest_only)
+    # Отдельный курсор: чтение не мешает записи через общее соединение
+    cursor = get_connection().cursor()
+    cursor.execute(sql, params)
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+
+def query_columns(date_from=None, date_to=None, task_types=None, task_numbers=None, latest_only=False,
+                  chunk_size=CHUNK_SIZE):
+    """
+    Колоночная форма выборки: {'day', 'task_type', 'task_number', 'result', 'timestamp'} — массивы array.
+    Результат приведен к 0/1; записи без даты или с некорректным результатом пропускаются.
+    Массивы можно без копирования превратить в NumPy: numpy.frombuffer(columns['day'], dtype=numpy.int64).
+    """
+    columns = {'day': array('q'), 'task_type': array('q'), 'task_number': array('q'),
+               'result': array('b'), 'timestamp': array('d')}
+    rows = iter_results(date_from, date_to, task_types, task_numbers, latest_only, chunk_size)
+    for date_time, task_number, task_type, result, day, timestamp, _ in rows:
+        r = normalize_result(result)
+        if r is None or day is None:
+            continue
+        columns['day'].append(day)
+        columns['task_type'].append(int(task_type))
+        columns['task_number'].append(int(task_number))
+        columns['result'].append(r)
+        columns['timestamp'].append(timestamp if timestamp is not None else float('nan'))
+    return columns
+
+
+def export_csv(file, **filters):
+    """Потоково пишет выборку в CSV (путь или открытый текстовый файл). Возвращает число строк."""
+    if isinstance(file, str):
+        with open(file, 'w', encoding='utf-8', newline='') as f:
+            return export_csv(f, **filters)
+    writer = csv.writer(file)
+    writer.writerow(RESULT_FIELDS)
+    count = 0
+    for row in iter_results(**filters):
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def import_csv(file):
+    """
+    Потоково добавляет записи из CSV (нужны столбцы date_time, task_number, task_type, result;
+    answer_hash — если есть) одной транзакцией; day и timestamp пересчитываются. Правило add_result
+    сохраняется: после правильного ответа новые записи по заданию не добавляются.
+    Возвращает число добавленных строк.
+    """
+    if isinstance(file, str):
+        with open(file, encoding='utf-8', newline='') as f:
+            return import_csv(f)
+    added = 0
+    with transaction() as cursor:
+        for record in csv.DictReader(file):
+            date_time = record['date_time']
+            task_number, task_type = int(record['task_number']), int(record['task_type'])
+            result = int(record['result']) if record['result'].lstrip('-').isdigit() else record['result']
+            if insert_result(cursor, date_time, task_number, task_type, result, record.get('answer_hash') or None):
+                added += 1
+    return added
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Экспорт и импорт истории результатов в CSV")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="выгрузить историю в CSV ('-' — стандартный вывод)")
+    export.add_argument('file')
+    export.add_argument('--from', dest='date_from', help="с даты (ГГГГ-ММ-ДД)")
+    export.add_argument('--to', dest='date_to', help="по дату включительно (ГГГГ-ММ-ДД)")
+    export.add_argument('--types', nargs='+', type=int, dest='task_types')
+    export.add_argument('--numbers', nargs='+', type=int, dest='task_numbers')
+    export.add_argument('--latest', action='store_true', dest='latest_only', help="только последние попытки")
+    load = commands.add_parser('import', help="добавить записи из CSV")
+    load.add_argument('file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'export':
+        filters = {name: getattr(args, name)
+                   for name in ('date_from', 'date_to', 'task_types', 'task_numbers', 'latest_only')}
+        count = export_csv(sys.stdout if args.file == '-' else args.file, **filters)
+        print(f"Выгружено записей: {count}", file=sys.stderr)
+    else:
+        print(f"Добавлено записей: {import_csv(args.file)}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,165 @@
+"""
+Простые и совершенные числа для заданий "5. Функции" (Задание 7, Задание 15).
+
+    from tests.number_theory import first_primes, iter_primes, first_perfect
+    first_primes(7)                  # array([ 2,  3,  5,  7, 11, 13, 17])
+    next(p for p in iter_primes() if p > 10 ** 9)
+    first_perfect(4)                 # [6, 28, 496, 8128]
+
+Простые числа ищет сегментированное решето Эратосфена: диапазон просеивается кусками
+по SEGMENT_SIZE чисел (хранятся только нечетные), а вычеркиваются кратные базовых простых
+до корня из конца куска. Память — O(SEGMENT_SIZE + корень из предела), а не O(предела).
+
+Суммы делителей считает такое же сегментированное решето (proper_divisor_sums), но для
+поиска совершенных чисел есть быстрый путь по теореме Евклида — Эйлера: четные совершенные
+числа — это 2^(p-1) * (2^p - 1), где 2^p - 1 — простое (проверка тестом Люка — Лемера).
+"""
+import math
+
+import numpy as np
+
+# Сколько чисел просеивается за один кусок
+SEGMENT_SIZE = 1 << 20
+# Первый кусок iter_primes; следующие удваиваются до SEGMENT_SIZE
+FIRST_SEGMENT = 1 << 12
+# До какого делителя 2^p - 1 проверяется пробным делением перед тестом Люка — Лемера
+MERSENNE_TRIAL_LIMIT = 1 << 20
+
+
+def small_primes(limit):
+    """Все простые до limit включительно простым решетом (для базовых простых сегментов)."""
+    if limit < 2:
+        return np.zeros(0, dtype=np.int64)
+    is_prime = np.ones(limit + 1, dtype=bool)
+    is_prime[:2] = False
+    for p in range(2, math.isqrt(limit) + 1):
+        if is_prime[p]:
+            is_prime[p * p::p] = False
+    return np.flatnonzero(is_prime).astype(np.int64)
+
+
+def nth_prime_bound(n):
+    """Верхняя оценка n-го простого (Россер): p_n < n (ln n + ln ln n) при n >= 6."""
+    if n < 6:
+        return (1, 2, 3, 5, 7, 11)[max(n, 0)]
+    return int(n * (math.log(n) + math.log(math.log(n)))) + 1
+
+
+def _sieve_segment(lo, hi, base):
+    """Простые в [lo, hi); base — нечетные простые, среди которых все до корня из hi - 1."""
+    two = [2] if lo <= 2 < hi else []
+    first = max(lo | 1, 3)  # первое нечетное >= lo, без единицы
+    if first >= hi:
+        return np.array(two, dtype=np.int64)
+    is_prime = np.ones((hi - first + 1) // 2, dtype=bool)  # is_prime[i] — число first + 2i
+    for p in base[:np.searchsorted(base, math.isqrt(hi - 1), side='right')].tolist():
+        start = max(p * p, -(-first // p) * p)
+        if start % 2 == 0:
+            start += p
+        is_prime[(start - first) // 2::p] = False
+    numbers = first + 2 * np.flatnonzero(is_prime).astype(np.int64)
+    return np.concatenate([np.array(two, dtype=np.int64), numbers]) if two else numbers
+
+
+def primes_in_range(lo, hi, segment_size=SEGMENT_SIZE):
+    """Генератор массивов простых из [lo, hi), по одному на кусок длиной segment_size."""
+    base = small_primes(math.isqrt(max(hi - 1, 0)))[1:]
+    for start in range(max(lo, 2), hi, segment_size):
+        yield _sieve_segment(start, min(start + segment_size, hi), base)
+
+
+def primes_up_to(limit, segment_size=SEGMENT_SIZE):
+    """Все простые до limit включительно одним массивом."""
+    parts = list(primes_in_range(2, limit + 1, segment_size))
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def iter_primes(start=2, segment_size=SEGMENT_SIZE):
+    """
+    Бесконечный поток простых >= start. Куски растут от FIRST_SEGMENT до segment_size,
+    базовые простые пересчитываются с запасом, когда конец куска перерастает их квадрат.
+    """
+    lo, size = max(start, 2), min(FIRST_SEGMENT, segment_size)
+    base, base_limit = np.zeros(0, dtype=np.int64), 1
+    while True:
+        hi = lo + size
+        if base_limit * base_limit < hi - 1:
+            base_limit = 2 * math.isqrt(hi - 1) + 1
+            base = small_primes(base_limit)[1:]
+        yield from _sieve_segment(lo, hi, base).tolist()
+        lo, size = hi, min(2 * size, segment_size)
+
+
+def first_primes(n, segment_size=SEGMENT_SIZE):
+    """Первые n простых массивом: решето до nth_prime_bound(n), которое останавливается на n-м."""
+    parts, found = [], 0
+    for primes in primes_in_range(2, nth_prime_bound(n) + 1, segment_size):
+        if found >= n:
+            break
+        parts.append(primes[:n - found])
+        found += len(parts[-1])
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=np.int64)
+
+
+def proper_divisor_sums(lo, hi):
+    """
+    Суммы собственных делителей (все делители, кроме самого числа) для чисел [lo, hi), lo >= 1.
+    Каждый делитель d <= корня из числа m добавляется вместе с парным m // d — поэтому
+    на кусок нужно O(корня из hi) проходов NumPy, а память — O(hi - lo).
+    """
+    sums = np.zeros(hi - lo, dtype=np.int64)
+    for d in range(1, math.isqrt(hi - 1) + 1):
+        first = max(d * d, -(-lo // d) * d)
+        if first >= hi:
+            continue
+        multiples = slice(first - lo, hi - lo, d)
+        sums[multiples] += d
+        sums[multiples] += np.arange(first // d, (hi - 1) // d + 1, dtype=np.int64)
+        if first == d * d:
+            sums[first - lo] -= d  # у квадрата d и m // d совпадают
+    return sums - np.arange(lo, hi, dtype=np.int64)
+
+
+def perfect_numbers_up_to(limit, segment_size=SEGMENT_SIZE):
+    """Совершенные числа до limit включительно прямым решетом сумм делителей (без теорем)."""
+    found = []
+    for start in range(2, limit + 1, segment_size):
+        hi = min(start + segment_size, limit + 1)
+        numbers = np.arange(start, hi, dtype=np.int64)
+        found.extend(numbers[proper_divisor_sums(start, hi) == numbers].tolist())
+    return found
+
+
+def is_mersenne_prime(p):
+    """Простое ли 2^p - 1 (p — простое): тест Люка — Лемера."""
+    if p == 2:
+        return True
+    mersenne = (1 << p) - 1
+    # Делители 2^p - 1 имеют вид 2kp + 1 и равны ±1 по модулю 8: малые отсеиваются без теста
+    for q in range(2 * p + 1, min(MERSENNE_TRIAL_LIMIT, math.isqrt(mersenne)) + 1, 2 * p):
+        if q % 8 in (1, 7) and pow(2, p, q) == 1:
+            return False
+    s = 4
+    for _ in range(p - 2):
+        s = s * s - 2
+        # Остаток по модулю 2^p - 1 без деления: старшие биты переносятся в младшие
+        s = (s & mersenne) + (s >> p)
+        if s >= mersenne:
+            s -= mersenne
+    return s == 0
+
+
+def iter_perfect():
+    """Четные совершенные числа по возрастанию: 2^(p-1) * (2^p - 1) для простых Мерсенна."""
+    for p in iter_primes():
+        if is_mersenne_prime(p):
+            yield (1 << (p - 1)) * ((1 << p) - 1)
+
+
+def first_perfect(n):
+    """
+    Первые n совершенных чисел по теореме Евклида — Эйлера. Нечетных совершенных чисел
+    меньше 10^1500 нет, поэтому для n <= 18 ответ доказанно полный.
+    """
+    perfect = iter_perfect()
+    return [next(perfect) for _ in range(n)]
@@ -0,0 +1,113 @@
+"""
+Быстрые ядра для упражнений с большими числами: факториал и сумма цифр.
+
+    from tests.numeric import factorial, digit_sum, digit_sums
+    digit_sum(factorial(10 ** 5))         # без str(): длинные числа Python не переводит в строку
+    digit_sums(np.array([123, -45, 0]))   # array([6, 9, 0])
+
+Учебные версии ("Факториал.py", "Сумма цифр числа.py") умножают и делят по одной цифре:
+каждый шаг работает с числом целиком, поэтому время растет квадратично от длины числа.
+Здесь большие числа дробятся пополам: факториал — произведение половин (binary splitting),
+сумма цифр — сборка десятичной записи из двоичных половин (to_decimal). Сравнение с циклами —
+python -m tests.benchmarks.numeric.
+"""
+import decimal
+
+import numpy as np
+
+# Числа короче стольких бит переводятся в строку напрямую: str() и Decimal() для длинных чисел
+# квадратичны (а str() еще и ограничен sys.get_int_max_str_digits)
+CHUNK_BITS = 2048
+
+
+def _odd_product(lo, hi):
+    """Произведение нечетных чисел в полуинтервале (lo, hi], делением диапазона пополам."""
+    first = lo + 1 if lo % 2 == 0 else lo + 2
+    count = (hi - first) // 2 + 1
+    if count <= 0:
+        return 1
+    if count <= 16:
+        result = first
+        for k in range(first + 2, hi + 1, 2):
+            result *= k
+        return result
+    # Граница — четное число, в левой половине count // 2 нечетных
+    mid = first + 2 * (count // 2) - 1
+    return _odd_product(lo, mid) * _odd_product(mid, hi)
+
+
+def factorial(n):
+    """
+    n! методом binary splitting: n! = (n // 2)! * 2^(n // 2) * (1 * 3 * 5 * ... до n).
+    Нечетная часть перемножается деревом, степень двойки добавляется одним сдвигом в конце.
+    """
+    if n < 0:
+        raise ValueError("Факториал определен только для неотрицательных чисел")
+    odd, shift = 1, 0
+    # Раскрываем рекурсию n -> n // 2: n! = 2^(сумма n_i // 2) * произведение нечетных частей
+    levels = []
+    while n > 1:
+        levels.append(n)
+        n //= 2
+    for m in reversed(levels):
+        odd *= _odd_product(0, m)  # нечетные числа до m
+        shift += m // 2
+    return odd << shift
+
+
+def _small_digit_sum(text):
+    return sum(d * text.count(str(d)) for d in range(1, 10))
+
+
+def to_decimal(x):
+    """
+    Точный decimal.Decimal для целого x делением пополам: x = high * 2^k + low, где k — половина
+    длины в битах. Половины в двоичной записи отделяются сдвигом, а собираются умножением
+    в decimal, которое для длинных чисел быстрое (libmpdec), в отличие от divmod на 10^k.
+    """
+    ctx = decimal.Context(prec=decimal.MAX_PREC, Emax=decimal.MAX_EMAX, Emin=decimal.MIN_EMIN)
+    powers = {}
+
+    def power_of_two(k):
+        if k not in powers:
+            powers[k] = ctx.power(decimal.Decimal(2), k)
+        return powers[k]
+
+    def split(value, bits):
+        if bits <= CHUNK_BITS:
+            return decimal.Decimal(value)
+        half = bits // 2
+        high, low = value >> half, value & ((1 << half) - 1)
+        return ctx.add(ctx.multiply(split(high, bits - half), power_of_two(half)), split(low, half))
+
+    return split(x, x.bit_length())
+
+
+def digit_sum(x):
+    """
+    Сумма цифр целого числа (знак не учитывается). Длинное число переводится в десятичную запись
+    через to_decimal, цифры считаются встроенным str.count — все шаги почти линейны по длине.
+    """
+    x = abs(x)
+    return _small_digit_sum(str(x) if x.bit_length() <= CHUNK_BITS else str(to_decimal(x)))
+
+
+def digit_sums(values):
+    """
+    Суммы цифр для массива целых (int64 и меньше) — по всем элементам сразу, по одной
+    десятичной позиции за проход (не больше 19 проходов). Знак не учитывается.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind not in 'iu':
+        raise TypeError(f"Ожидался массив целых чисел, получен {values.dtype}")
+    # Модуль в uint64: у -2^63 в int64 нет положительной пары
+    if values.dtype.kind == 'i':
+        signed = values.astype(np.int64)
+        rest = np.where(signed < 0, ~signed.view(np.uint64) + np.uint64(1), signed.view(np.uint64))
+    else:
+        rest = values.astype(np.uint64)
+    total = np.zeros(values.shape, dtype=np.int64)
+    while rest.any():
+        rest, digit = np.divmod(rest, np.uint64(10))
+        total += digit.astype(np.int64)
+    return total
@@ -0,0 +1,273 @@
+"""
+Колоночный движок расчета прогресса.
+Ячейка — (тип, день, номер задания) с числом попыток, числом верных и последним результатом.
+День хранится как номер дня от 1970-01-01 (см. conftest.date_keys), поэтому сортируется как число.
+"""
+import os
+from datetime import date
+
+import numpy as np
+
+from .conftest import date_to_day, get_progress, progress_day_from, solved_cells
+from .history import query_columns
+
+# Сколько последних дат показывает детальная таблица (размер страницы)
+DETAILED_TABLE_DAYS = int(os.environ.get('PROGRESS_TABLE_DAYS', 30))
+# Сколько страниц детальной таблицы сохранять: detailed_progress, detailed_progress_2, ...
+DETAILED_TABLE_PAGES = int(os.environ.get('PROGRESS_TABLE_PAGES', 1))
+
+# Темы и число последних дат общего графика (см. common_percentages)
+COMMON_TYPES = range(1, 28)
+COMMON_LAST_DATES = 5
+# Коэффициент общего графика перестает расти после стольких ячеек с верным ответом
+SOLVED_CELLS_CAP = 10
+
+
+def progress_columns(progress=None, day_from=None):
+    """
+    Загружает агрегат progress в массивы NumPy:
+    {'type', 'day', 'number', 'attempts', 'correct', 'last'} — по массиву на поле ячейки.
+    day_from — читать из БД только ячейки с day >= day_from.
+    """
+    if progress is None:
+        progress = get_progress(day_from=day_from)
+    if not progress:
+        empty = np.zeros(0, dtype=np.int64)
+        return {'type': empty, 'day': empty, 'number': empty,
+                'attempts': empty, 'correct': empty, 'last': empty}
+
+    task_type, day, task_number, attempts, correct, last_result = zip(*progress)
+    return {
+        'type': np.array(task_type, dtype=np.int64),
+        'day': np.array(day, dtype=np.int64),
+        'number': np.array(task_number, dtype=np.int64),
+        'attempts': np.array(attempts, dtype=np.int64),
+        'correct': np.array(correct, dtype=np.int64),
+        'last': np.array(last_result, dtype=np.int64),
+    }
+
+
+def chart_columns(types=COMMON_TYPES, last_dates=COMMON_LAST_DATES,
+                  days=DETAILED_TABLE_DAYS * max(1, DETAILED_TABLE_PAGES)):
+    """
+    Ячейки, нужные обоим графикам, одной загрузкой: последние days дат детальной таблицы
+    и последние last_dates дат каждого типа из types для общего графика.
+    Возвращает (columns, solved), где solved — {тип: ячеек с верным ответом, не больше SOLVED_CELLS_CAP}
+    для common_percentages или None, если агрегат загружен целиком.
+    Объем чтения определяется окнами дат, а не длиной истории.
+    """
+    day_from = progress_day_from(days)
+    if day_from is None:
+        return progress_columns(), None
+    progress = get_progress(day_from=day_from)
+    solved = {}
+    for t in types:
+        # Более ранние даты типа, не попавшие в окно детальной таблицы
+        type_from = progress_day_from(last_dates, t)
+        if type_from is None or type_from < day_from:
+            progress += get_progress(t, type_from, day_from)
+        solved[t] = solved_cells(t, SOLVED_CELLS_CAP)
+    return progress_columns(progress), solved
+
+
+def history_columns(**filters):
+    """
+    Сырая история в виде массивов NumPy (см. history.query_columns, те же фильтры):
+    {'day', 'task_type', 'task_number', 'result', 'timestamp'}. Массивы разделяют память с array.
+    """
+    columns = query_columns(**filters)
+    dtypes = {'day': np.int64, 'task_type': np.int64, 'task_number': np.int64,
+              'result': np.int8, 'timestamp': np.float64}
+    return {name: np.frombuffer(values, dtype=dtypes[name]) if len(values) else np.zeros(0, dtypes[name])
+            for name, values in columns.items()}
+
+
+def window_columns(columns, last_dates=None, day_from=None, day_to=None):
+    """
+    Оставляет только ячейки из окна дат: последние last_dates различных дат
+    и/или диапазон номеров дней [day_from, day_to] (границы включительно, None — без границы).
+    """
+    d = columns['day']
+    keep = np.ones(d.size, dtype=bool)
+    if day_from is not None:
+        keep &= d >= day_from
+    if day_to is not None:
+        keep &= d <= day_to
+    if last_dates is not None:
+        days = np.unique(d[keep])
+        if days.size > last_dates:
+            keep &= d >= days[-last_dates] if last_dates > 0 else False
+    return {name: values[keep] for name, values in columns.items()}
+
+
+def rows_to_columns(day, task_type, task_number, result):
+    """
+    Сворачивает сырую историю (массивы одинаковой длины в порядке добавления записей:
+    номер дня, тип, номер, результат 0/1) в ячейки того же вида, что и progress_columns.
+    """
+    day = np.asarray(day, dtype=np.int64)
+    task_type = np.asarray(task_type, dtype=np.int64)
+    task_number = np.asarray(task_number, dtype=np.int64)
+    result = np.asarray(result, dtype=np.int64)
+
+    # Устойчивая сортировка по ключу ячейки сохраняет порядок записей внутри ячейки
+    order = np.lexsort((task_number, day, task_type))
+    keys = np.stack((task_type[order], day[order], task_number[order]))
+    if order.size:
+        starts = np.flatnonzero(np.concatenate(([True], (keys[:, 1:] != keys[:, :-1]).any(axis=0))))
+    else:
+        starts = np.zeros(0, dtype=np.int64)
+    ends = np.append(starts[1:], order.size) - 1
+    sorted_result = result[order]
+    cell = np.repeat(np.arange(starts.size), np.diff(np.append(starts, order.size)))
+    return {
+        'type': keys[0, starts],
+        'day': keys[1, starts],
+        'number': keys[2, starts],
+        'attempts': np.bincount(cell, minlength=starts.size).astype(np.int64),
+        'correct': np.bincount(cell, weights=sorted_result, minlength=starts.size).astype(np.int64),
+        'last': sorted_result[ends],
+    }
+
+
+def _combine_keys(major, minor):
+    """Склеивает два неотрицательных целочисленных ключа в один int64 с тем же порядком сортировки."""
+    span = int(minor.max()) - int(minor.min()) + 1 if minor.size else 1
+    return major * span + (minor - (minor.min() if minor.size else 0))
+
+
+def common_percentages(columns, types=COMMON_TYPES, last_dates=COMMON_LAST_DATES, solved=None):
+    """
+    Показатель успеваемости по каждому типу из types (см. show_common_progress):
+    среднее по номерам заданий за последние last_dates дат, умноженное на коэффициент
+    за число верно решённых заданий.
+    solved — {тип: число ячеек с верным ответом} (см. chart_columns), если columns содержит
+    не весь агрегат; по умолчанию считается по columns.
+    """
+    types = np.asarray(list(types), dtype=np.int64)
+    t, d, n = columns['type'], columns['day'], columns['number']
+    attempts, correct = columns['attempts'], columns['correct']
+    if t.size == 0:
+        return [0.0] * types.size
+    size = int(max(types.max(), t.max())) + 1
+
+    # Номер даты среди дат своего типа, считая с последней: 0, 1, 2...
+    pair_keys, pair_index = np.unique(_combine_keys(t, d.max() - d), return_inverse=True)
+    pair_types = pair_keys // (d.max() - d.min() + 1)
+    first_of_type = np.searchsorted(pair_types, pair_types, side='left')
+    rank = np.arange(pair_keys.size) - first_of_type
+    recent = rank[pair_index.ravel()] < last_dates
+
+    # Среднее по каждому номеру задания за последние даты, затем по номерам внутри типа
+    task_keys, task_index = np.unique(_combine_keys(t[recent], n[recent]), return_inverse=True)
+    task_index = task_index.ravel()
+    task_attempts = np.bincount(task_index, weights=attempts[recent], minlength=task_keys.size)
+    task_correct = np.bincount(task_index, weights=correct[recent], minlength=task_keys.size)
+    task_means = task_correct / task_attempts
+    task_types = t[recent][np.unique(task_index, return_index=True)[1]]
+    mean_sum = np.bincount(task_types, weights=task_means, minlength=size)
+    mean_count = np.bincount(task_types, minlength=size)
+
+    # Коэффициент: 10% за каждую ячейку (дата, номер) с верным ответом, но не больше 100%
+    if solved is None:
+        solved = np.bincount(t[correct > 0], minlength=size)
+    else:
+        solved = np.array([min(solved.get(x, 0), SOLVED_CELLS_CAP) for x in range(size)], dtype=np.int64)
+    coefficient = np.where(solved < SOLVED_CELLS_CAP, (solved * 10) / 100.0, 1.0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        percent = np.where(mean_count > 0, (mean_sum / mean_count) * 100, 0.0) * coefficient
+    return [float(percent[x]) if x < size else 0.0 for x in types]
+
+
+def detailed_table(columns, last_dates=DETAILED_TABLE_DAYS):
+    """
+    Данные для детальной таблицы (см. show_detailed_progress_table):
+    даты (номера дней, последние первыми), типы по возрастанию,
+    матрица средних результатов (NaN — нет данных) и тексты ячеек {(i, j): "+7\n-16"}.
+    Строятся только для последних last_dates дат (None — для всех ячеек columns):
+    подписи — поштучная работа на Python, и на всей истории они заняли бы секунды.
+    """
+    if last_dates is not None:
+        columns = window_columns(columns, last_dates)
+    t, d, n, last = columns['type'], columns['day'], columns['number'], columns['last']
+    sorted_dates, row = np.unique(-d, return_inverse=True)
+    sorted_dates = -sorted_dates
+    sorted_types, col = np.unique(t, return_inverse=True)
+    row, col = row.ravel(), col.ravel()
+
+    shape = (sorted_dates.size, sorted_types.size)
+    flat = row * shape[1] + col
+    total = np.bincount(flat, weights=last, minlength=shape[0] * shape[1])
+    count = np.bincount(flat, minlength=shape[0] * shape[1])
+    with np.errstate(invalid='ignore', divide='ignore'):
+        table_data = np.where(count > 0, total / count, np.nan).reshape(shape)
+
+    # Тексты: номера по возрастанию внутри ячейки, '+' для верных, '-' для неверных
+    order = np.lexsort((n, flat))
+    sorted_flat = flat[order]
+    labels = [f"{'+' if res == 1 else '-'}{num}" for res, num in zip(last[order].tolist(), n[order].tolist())]
+    starts = np.flatnonzero(np.diff(sorted_flat, prepend=-1)).tolist()
+    cells = sorted_flat[starts].tolist()
+    starts.append(order.size)
+    cell_texts = {divmod(cell, shape[1]): "\n".join(labels[starts[k]:starts[k + 1]])
+                  for k, cell in enumerate(cells)}
+
+    return sorted_dates.tolist(), sorted_types.tolist(), table_data, cell_texts
+
+
+def _as_day(value):
+    """Граница окна: datetime.date или уже номер дня."""
+    return date_to_day(value) if isinstance(value, date) else value
+
+
+def detailed_window(last_dates=DETAILED_TABLE_DAYS, date_from=None, date_to=None, columns=None):
+    """
+    Данные детальной таблицы (см. detailed_table) для окна: последние last_dates дат (None — все)
+    в пределах [date_from, date_to] — datetime.date или номера дней. None, если в окне нет ячеек.
+    Без columns ячейки читаются из БД.
+    """
+    day_from, day_to = _as_day(date_from), _as_day(date_to)
+    if columns is None:
+        # Последние даты без верхней границы выбираются в SQL; с day_to окно считается по загруженному
+        columns = progress_columns(day_from=progress_day_from(last_dates) if last_dates and day_to is None else None)
+    columns = window_columns(columns, last_dates, day_from, day_to)
+    if columns['type'].size == 0:
+        return None
+    return detailed_table(columns, last_dates=None)
+
+
+def detailed_pages(days_per_page=DETAILED_TABLE_DAYS, pages=DETAILED_TABLE_PAGES, columns=None):
+    """
+    Данные страниц детальной таблицы (см. page_windows): список результатов detailed_window,
+    None — страница с надписью "нет данных". Без columns из БД читаются только даты всех страниц.
+    """
+    if columns is None:
+        columns = progress_columns(day_from=progress_day_from(days_per_page * max(1, pages)))
+    return [None if window is None else detailed_window(None, window[0], window[1], columns)
+            for window in page_windows(columns, days_per_page, pages)]
+
+
+def common_progress(types=COMMON_TYPES, columns=None, solved=None):
+    """Показатели общего графика по типам types (см. common_percentages); без columns — см. chart_columns."""
+    if columns is None:
+        columns, solved = chart_columns(types)
+    return common_percentages(columns, types, solved=solved)
+
+
+def page_windows(columns, days_per_page=DETAILED_TABLE_DAYS, pages=DETAILED_TABLE_PAGES):
+    """
+    Окна страниц детальной таблицы: первая — последние days_per_page дат, вторая — предыдущие и т.д.
+    Возвращает список (день_с, день_по), не больше pages; пустые страницы не создаются.
+    Если данных нет совсем, возвращает [None] — одна страница с надписью "нет данных".
+    """
+    days = np.unique(columns['day'])[::-1]
+    if days.size == 0:
+        return [None]
+    windows = []
+    for page in range(max(1, pages)):
+        page_days = days[page * days_per_page:(page + 1) * days_per_page]
+        if page_days.size == 0:
+            break
+        windows.append((int(page_days[-1]), int(page_days[0])))
+    return windows
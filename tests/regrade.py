@@ -0,0 +1,153 @@
+"""
+Перепроверка истории после исправления эталонных ответов.
+
+    python -m tests.regrade              # все темы
+    python -m tests.regrade 7 11         # только темы 7 и 11
+    python -m tests.regrade --dry-run    # только показать, что изменится
+
+Эталонные хеши берутся из вызовов result_register(тип, номер, ответ, 'md5') в task-скриптах:
+скрипты только разбираются модулем ast и не выполняются. Затем одной транзакцией результат
+каждой записи пересчитывается по сохраненному хешу ответа (столбец answer_hash), агрегат
+progress перестраивается, а графики перерисовываются и коммитятся один раз.
+
+Записи, сделанные до появления answer_hash, перепроверить нельзя — их результат не меняется.
+"""
+import argparse
+import ast
+import sys
+
+from tests.conftest import ensure_indexes, mark_task_files, publish_progress, rebuild_progress, transaction
+from tests.grader import discover_task_scripts
+
+
+class _DryRun(Exception):
+    """Откат транзакции в режиме --dry-run."""
+
+
+def _literal_int(node, default):
+    try:
+        return int(ast.literal_eval(node))
+    except (ValueError, TypeError, SyntaxError):
+        return default
+
+
+def script_keys(path, task_type, number):
+    """
+    Эталоны из одного скрипта: [(тип, номер, хеш)] по всем вызовам result_register с хешем-строкой.
+    Если тип или номер в вызове не литерал, берутся из имени файла и папки.
+    """
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    keys = []
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call) or len(node.args) < 4:
+            continue
+        func = node.func
+        name = func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)
+        right_result = node.args[3]
+        if name != 'result_register' or not isinstance(right_result, ast.Constant) \
+                or not isinstance(right_result.value, str):
+            continue
+        keys.append((_literal_int(node.args[0], task_type), _literal_int(node.args[1], number), right_result.value))
+    return keys
+
+
+def extract_keys(types=None):
+    """
+    Эталоны всех task-скриптов выбранных тем: ({(тип, номер): хеш}, [(путь, ошибка)]).
+    Скрипты с синтаксическими ошибками пропускаются и попадают в список ошибок.
+    """
+    keys, errors = {}, []
+    for t, number, path in discover_task_scripts(types):
+        try:
+            for task_type, task_number, right_result in script_keys(path, t, number):
+                keys[(task_type, task_number)] = right_result
+        except (SyntaxError, UnicodeDecodeError) as e:
+            errors.append((path, f"{type(e).__name__}: {e}"))
+    return keys, errors
+
+
+def _solved(cursor):
+    return set(cursor.execute('SELECT DISTINCT task_type, task_number FROM test WHERE result = 1 '
+                              'AND (task_type, task_number) IN (SELECT task_type, task_number FROM regrade_keys)'))
+
+
+def regrade(keys, dry_run=False):
+    """
+    Пересчитывает историю по эталонам keys {(тип, номер): хеш} одной транзакцией.
+
+    Результат записи с сохраненным хешем ответа становится 1, если хеш совпал с эталоном, иначе 0.
+    Записи не удаляются: если у задания стало несколько правильных ответов, уникальный индекс
+    test_correct_once не восстанавливается — как и для старых БД (см. ensure_indexes).
+    Затем перестраивается агрегат progress, переименовываются файлы заданий, у которых
+    изменился статус, и один раз перерисовываются графики.
+
+    Возвращает {'changed': записей с новым результатом, 'solved': [(тип, номер)] ставшие решенными,
+    'unsolved': [(тип, номер)] переставшие быть решенными}.
+    """
+    stats = {}
+    try:
+        with transaction() as cursor:
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS regrade_keys ('
+                           'task_type INTEGER, task_number INTEGER, hash TEXT, '
+                           'PRIMARY KEY (task_type, task_number)) WITHOUT ROWID')
+            cursor.execute('DELETE FROM regrade_keys')
+            cursor.executemany('INSERT INTO regrade_keys VALUES (?, ?, ?)',
+                               ((t, n, right_result) for (t, n), right_result in keys.items()))
+            before = _solved(cursor)
+
+            # После пересчета правильных ответов на задание может стать несколько —
+            # тогда уникальный индекс не восстановится, а история останется как есть
+            cursor.execute('DROP INDEX IF EXISTS test_correct_once')
+            cursor.execute('''
+                UPDATE test SET result = (answer_hash = (SELECT hash FROM regrade_keys k
+                                                         WHERE k.task_type = test.task_type
+                                                           AND k.task_number = test.task_number))
+                WHERE answer_hash IS NOT NULL
+                  AND (task_type, task_number) IN (SELECT task_type, task_number FROM regrade_keys)
+                  AND result IS NOT (answer_hash = (SELECT hash FROM regrade_keys k
+                                                    WHERE k.task_type = test.task_type
+                                                      AND k.task_number = test.task_number))
+            ''')
+            stats['changed'] = cursor.rowcount
+            ensure_indexes(cursor)
+
+            after = _solved(cursor)
+            stats['solved'] = sorted(after - before)
+            stats['unsolved'] = sorted(before - after)
+            if dry_run:
+                raise _DryRun
+            if stats['changed']:
+                rebuild_progress(cursor)
+    except _DryRun:
+        return stats
+
+    if stats['changed']:
+        for t, n in stats['solved']:
+            mark_task_files(t, n, True)
+        for t, n in stats['unsolved']:
+            mark_task_files(t, n, False)
+        publish_progress(f"Перепроверка истории: изменено {stats['changed']} записей")
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Перепроверка истории по эталонам из task-скриптов")
+    parser.add_argument('types', nargs='*', type=int, help="номера тем (по умолчанию все)")
+    parser.add_argument('--dry-run', action='store_true', help="не изменять БД, файлы и Git")
+    args = parser.parse_args(argv)
+
+    keys, errors = extract_keys(args.types or None)
+    for path, error in errors:
+        print(f"Пропущен {path}: {error}", file=sys.stderr)
+    stats = regrade(keys, args.dry_run)
+    print(f"Эталонов: {len(keys)}; изменено записей: {stats['changed']}")
+    for t, n in stats['solved']:
+        print(f"Тема {t}, задание {n}: теперь Верно")
+    for t, n in stats['unsolved']:
+        print(f"Тема {t}, задание {n}: теперь Неверно")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
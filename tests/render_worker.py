@@ -0,0 +1,165 @@
+"""
+Фоновая отрисовка графиков прогресса.
+
+result_register в режиме PROGRESS_RENDER=async не ждет matplotlib: он дописывает
+сообщение коммита в очередь .render.pending в папке данных ученика (см. data_dir)
+и запускает отдельный процесс
+
+    python -m tests.render_worker
+
+Процесс наследует PROGRESS_STUDENT запустившего его скрипта, переживает завершение
+task-скрипта, рисует графики по последнему состоянию БД этого ученика и создает один коммит
+на все накопившиеся регистрации — вместе с переименованными файлами заданий (очередь
+.render.staged). Для каждой папки данных одновременно работает только один такой процесс
+(файл-блокировка .render.lock там же); лишние запуски сразу завершаются.
+Коммиты процессов разных учеников выполняются по очереди (tests/.render.git.lock).
+"""
+import os
+import subprocess
+import sys
+import time
+
+from tests.conftest import (commit_message, commit_staged, data_dir, render_progress, report_spans, repo_root, span,
+                            stage_file, take_staged)
+
+# Пауза перед отрисовкой, чтобы серия быстрых регистраций попала в одну отрисовку
+DEBOUNCE_SECONDS = 0.3
+
+# Блокировка старше этого времени считается оставшейся от упавшего процесса
+STALE_LOCK_SECONDS = 600
+
+
+# Сколько ждать, пока коммит создает процесс другого ученика
+GIT_LOCK_POLL_SECONDS = 0.05
+
+
+def pending_path():
+    return os.path.join(data_dir(), '.render.pending')
+
+
+def staged_path():
+    # Файлы, которые нужно добавить в Git вместе с графиками, — по одному пути в строке
+    return os.path.join(data_dir(), '.render.staged')
+
+
+def lock_path():
+    return os.path.join(data_dir(), '.render.lock')
+
+
+def git_lock_path():
+    # Индекс Git общий для всех учеников: коммиты фоновых процессов не должны пересекаться
+    return os.path.join(repo_root(), 'tests', '.render.git.lock')
+
+
+def _queue_staged(paths):
+    if paths:
+        with open(staged_path(), 'a', encoding='utf-8') as f:
+            f.write(''.join(path + '\n' for path in paths))
+
+
+def request_render(message, paths=()):
+    """
+    Ставит отрисовку с коммитом message в очередь и запускает фоновый процесс.
+    paths — файлы (например, переименованные файлы заданий), которые войдут в тот же коммит.
+    """
+    _queue_staged(paths)
+    with open(pending_path(), 'a', encoding='utf-8') as f:
+        f.write(message.replace('\n', ' ') + '\n')
+
+    kwargs = {}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+    # Процесс запускается всегда: если отрисовка уже идет, он увидит блокировку и выйдет,
+    # а работающий процесс заберет новую запись очереди
+    subprocess.Popen(
+        [sys.executable, '-m', 'tests.render_worker'],
+        cwd=repo_root(),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        **kwargs
+    )
+
+
+def _acquire_lock(path=None):
+    path = path or lock_path()
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            if time.time() - os.path.getmtime(path) < STALE_LOCK_SECONDS:
+                return False
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return _acquire_lock(path)
+    with os.fdopen(fd, 'w') as f:
+        f.write(str(os.getpid()))
+    return True
+
+
+def _release_lock(path=None):
+    try:
+        os.remove(path or lock_path())
+    except FileNotFoundError:
+        pass
+
+
+def _take_lines(path):
+    """Атомарно забирает все строки из файла очереди."""
+    taking = path + '.taking'
+    try:
+        os.replace(path, taking)
+    except FileNotFoundError:
+        return []
+    with open(taking, encoding='utf-8') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    os.remove(taking)
+    return lines
+
+
+def _take_pending():
+    """Атомарно забирает все сообщения из очереди."""
+    return _take_lines(pending_path())
+
+
+def _has_pending():
+    return os.path.exists(pending_path())
+
+
+def run():
+    """Обрабатывает очередь, пока в ней есть записи. Возвращает число созданных отрисовок."""
+    renders = 0
+    while _has_pending():
+        if not _acquire_lock():
+            return renders  # очередь заберет уже работающий процесс
+        try:
+            while _has_pending():
+                time.sleep(DEBOUNCE_SECONDS)
+                messages = _take_pending()
+                if not messages:
+                    continue
+                with span('total'):
+                    render_progress()
+                    while not _acquire_lock(git_lock_path()):
+                        time.sleep(GIT_LOCK_POLL_SECONDS)
+                    try:
+                        for path in _take_lines(staged_path()):
+                            stage_file(path)
+                        commit_staged(commit_message(messages))
+                        # Не добавленные git add файлы возвращаем в очередь: их заберет следующая отрисовка
+                        _queue_staged(take_staged())
+                    finally:
+                        _release_lock(git_lock_path())
+                renders += 1
+                report_spans(f"фоновая отрисовка ({len(messages)})")
+        finally:
+            _release_lock()
+        # Запись могла появиться между последней проверкой и снятием блокировки — проверяем снова
+    return renders
+
+
+if __name__ == '__main__':
+    run()
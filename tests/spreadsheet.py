@@ -0,0 +1,432 @@
+"""
+Загрузка таблиц заданий (.xlsx, .ods) в колонки NumPy с кешем на диске.
+
+    from tests.spreadsheet import load, join, where, group_by
+    book = load('Задание 12.xlsx')                     # {лист: {столбец: массив}}
+    sales = join(book['Торговля'], book['Товар'], 'Артикул')
+    tea = where(sales, (sales['Операция'] == 'Продажа')
+                       & (np.char.strip(sales['Наименование товара']) == 'Чай зеленый'))
+    group_by(tea, 'Магазин', 'Количество упаковок, шт')   # {'Магазин': [...], 'Количество...': суммы}
+
+Книга читается только стандартной библиотекой: zipfile и потоковый разбор XML (expat,
+iterparse), строки листа отдаются по мере разбора. Первая строка листа — заголовки.
+Типы столбцов: целые (int64), дробные (float64, пустые — NaN), даты (datetime64[D]),
+остальное — строки фиксированной ширины (пустые — ''); значения ячеек не обрезаются.
+
+Разобранная книга сохраняется в tests/.sheet_cache/<sha256 файла>/ как .npy-файлы
+и при следующих загрузках открывается через np.load(mmap_mode='r') — без разбора XML
+и без чтения данных в память заранее. Кеш не зависит от имени файла, только от содержимого.
+"""
+import hashlib
+import json
+import os
+import re
+import shutil
+import zipfile
+from datetime import date, datetime
+from xml.etree.ElementTree import iterparse
+from xml.parsers import expat
+
+import numpy as np
+
+from .conftest import repo_root
+
+# Пространства имен XML
+XLSX_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+TABLE_NS = '{urn:oasis:names:tc:opendocument:xmlns:table:1.0}'
+OFFICE_NS = '{urn:oasis:names:tc:opendocument:xmlns:office:1.0}'
+TEXT_NS = '{urn:oasis:names:tc:opendocument:xmlns:text:1.0}'
+
+# Встроенные форматы Excel, означающие дату
+XLSX_DATE_FORMATS = set(range(14, 23)) | {45, 46, 47}
+# Нулевой день дат Excel (с учетом ошибки 1900 года)
+XLSX_EPOCH = date(1899, 12, 30).toordinal()
+
+CACHE_DIR = os.path.join(repo_root(), 'tests', '.sheet_cache')
+# Версия формата кеша: при изменении разбора старые кеши не используются
+CACHE_VERSION = 1
+
+# Загруженные книги в пределах процесса: путь -> ((mtime, размер), хеш, книга)
+_loaded = {}
+
+
+def _column_index(ref):
+    """'B12' -> 1 (номер столбца с нуля)."""
+    index = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        index = index * 26 + ord(ch.upper()) - ord('A') + 1
+    return index - 1
+
+
+def _shared_strings(archive):
+    if 'xl/sharedStrings.xml' not in archive.namelist():
+        return []
+    strings = []
+    with archive.open('xl/sharedStrings.xml') as f:
+        for _, element in iterparse(f):
+            if element.tag == XLSX_NS + 'si':
+                strings.append(''.join(t.text or '' for t in element.iter(XLSX_NS + 't')))
+                element.clear()
+    return strings
+
+
+def _date_styles(archive):
+    """Номера стилей ячеек (атрибут s), у которых формат числа — дата."""
+    if 'xl/styles.xml' not in archive.namelist():
+        return set()
+    custom = {}
+    styles = []
+    with archive.open('xl/styles.xml') as f:
+        in_cell_xfs = False
+        for event, element in iterparse(f, events=('start', 'end')):
+            if element.tag == XLSX_NS + 'numFmt' and event == 'end':
+                # Пользовательский формат с днем/месяцем/годом вне кавычек и [цвета]
+                code = re.sub(r'"[^"]*"|\[[^]]*]', '', element.get('formatCode', ''))
+                custom[int(element.get('numFmtId'))] = bool(re.search(r'[dmyДМГ]', code, re.IGNORECASE))
+            elif element.tag == XLSX_NS + 'cellXfs':
+                in_cell_xfs = event == 'start'
+            elif element.tag == XLSX_NS + 'xf' and event == 'end' and in_cell_xfs:
+                styles.append(int(element.get('numFmtId', 0)))
+    return {s for s, fmt in enumerate(styles) if fmt in XLSX_DATE_FORMATS or custom.get(fmt)}
+
+
+def _xlsx_sheets(archive):
+    """[(имя листа, путь к XML листа в архиве)] в порядке книги."""
+    targets = {}
+    with archive.open('xl/_rels/workbook.xml.rels') as f:
+        for _, element in iterparse(f):
+            if element.tag == PKG_REL_NS + 'Relationship':
+                target = element.get('Target').lstrip('/')
+                targets[element.get('Id')] = target if target.startswith('xl/') else 'xl/' + target
+    sheets = []
+    with archive.open('xl/workbook.xml') as f:
+        for _, element in iterparse(f):
+            if element.tag == XLSX_NS + 'sheet':
+                sheets.append((element.get('name'), targets[element.get(REL_NS + 'id')]))
+    return sheets
+
+
+def _iter_xlsx_rows(archive, member, strings, date_styles, chunk_size=1 << 20):
+    """
+    Строки листа: списки значений (float, str, date или None), пропущенные строки — пустые списки.
+    Лист разбирается expat'ом по кускам без построения дерева элементов: это самая объемная часть
+    книги (десятки мегабайт XML на лист "Торговля").
+    """
+    parser = expat.ParserCreate()
+    ready = []  # строки, законченные в текущем куске
+    columns = {}  # буквы столбца -> номер
+    row, expected = [], 1
+    column, kind, style, value, text = 0, 'n', 0, None, None
+
+    def start(tag, attrs):
+        nonlocal row, expected, column, kind, style, value, text
+        if tag == 'c':
+            ref = attrs.get('r')
+            if ref:
+                letters = ref.rstrip('0123456789')
+                column = columns.get(letters)
+                if column is None:
+                    column = columns[letters] = _column_index(letters)
+            else:
+                column = len(row)
+            kind = attrs.get('t', 'n')
+            style = int(attrs.get('s', 0))
+            value = None
+        elif tag == 'v' or tag == 't':
+            text = []
+        elif tag == 'row':
+            number = int(attrs.get('r', expected))
+            ready.extend([] for _ in range(number - expected))
+            expected = number + 1
+            row = []
+
+    def data(chunk):
+        if text is not None:
+            text.append(chunk)
+
+    def end(tag):
+        nonlocal value, text
+        if tag == 'v' or tag == 't':
+            part = ''.join(text)
+            value = part if value is None or tag == 'v' else value + part
+            text = None
+        elif tag == 'c':
+            if value is None:
+                return
+            if kind == 's':
+                cell = strings[int(value)]
+            elif kind == 'n':
+                cell = float(value)
+                if style in date_styles:
+                    cell = date.fromordinal(XLSX_EPOCH + int(cell))
+            elif kind == 'b':
+                cell = float(value)
+            else:  # str, inlineStr, e
+                cell = value
+            if column > len(row):
+                row.extend([None] * (column - len(row)))
+            row.append(cell)
+        elif tag == 'row':
+            ready.append(row)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = data
+    parser.buffer_text = True
+    with archive.open(member) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            parser.Parse(chunk, not chunk)
+            yield from ready
+            ready.clear()
+            if not chunk:
+                break
+
+
+def _ods_cell_value(cell):
+    kind = cell.get(OFFICE_NS + 'value-type')
+    if kind in ('float', 'percentage', 'currency'):
+        return float(cell.get(OFFICE_NS + 'value'))
+    if kind == 'date':
+        return datetime.fromisoformat(cell.get(OFFICE_NS + 'date-value')).date()
+    if kind == 'boolean':
+        return float(cell.get(OFFICE_NS + 'boolean-value') == 'true')
+    if kind is None:
+        return None
+    return '\n'.join(''.join(p.itertext()) for p in cell.iter(TEXT_NS + 'p'))
+
+
+def _iter_ods_sheets(archive):
+    """[(имя листа, строки)] — строки как в _iter_xlsx_rows. Лист читается целиком потоково."""
+    sheets = []
+    rows = None
+    with archive.open('content.xml') as f:
+        for event, element in iterparse(f, events=('start', 'end')):
+            if element.tag == TABLE_NS + 'table':
+                if event == 'start':
+                    rows = []
+                    sheets.append((element.get(TABLE_NS + 'name'), rows))
+                else:
+                    element.clear()
+            elif element.tag == TABLE_NS + 'table-row' and event == 'end':
+                row = []
+                for cell in element:
+                    if cell.tag not in (TABLE_NS + 'table-cell', TABLE_NS + 'covered-table-cell'):
+                        continue
+                    value = _ods_cell_value(cell)
+                    repeat = int(cell.get(TABLE_NS + 'number-columns-repeated', 1))
+                    if value is None:
+                        # Хвостовые пустые ячейки (повторенные до конца листа) не разворачиваем
+                        row.extend([None] * min(repeat, 1024))
+                    else:
+                        row.extend([value] * repeat)
+                while row and row[-1] is None:
+                    row.pop()
+                repeat = int(element.get(TABLE_NS + 'number-rows-repeated', 1))
+                rows.extend([row] * (repeat if row else min(repeat, 1024)))
+                element.clear()
+    for _, rows in sheets:
+        while rows and not rows[-1]:
+            rows.pop()
+    return sheets
+
+
+def _typed_column(values):
+    """Список значений столбца -> массив NumPy подходящего типа."""
+    present = [v for v in values if v is not None and v != '']
+    if present and all(isinstance(v, float) for v in present):
+        if len(present) == len(values) and all(v.is_integer() for v in present):
+            return np.array(values, dtype=np.int64)
+        return np.array([np.nan if v is None or v == '' else v for v in values], dtype=np.float64)
+    if present and all(isinstance(v, date) for v in present):
+        return np.array([np.datetime64(v, 'D') if isinstance(v, date) else np.datetime64('NaT')
+                         for v in values], dtype='datetime64[D]')
+    text = ['' if v is None else _format(v) for v in values]
+    return np.array(text, dtype=f'<U{max(map(len, text), default=0) or 1}')
+
+
+def _format(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _columns(rows):
+    """Строки листа -> {заголовок: массив}. Повторяющиеся заголовки получают суффикс _2, _3..."""
+    rows = iter(rows)
+    header = next(rows, [])
+    while header and header[-1] in (None, ''):
+        header = header[:-1]
+    names = []
+    for k, name in enumerate(header):
+        # Переносы строк в заголовках ("Количество\nупаковок") заменяются пробелами
+        name = ' '.join(_format(name).split()) if name not in (None, '') else f'Столбец {k + 1}'
+        base, suffix = name, 2
+        while name in names:
+            name, suffix = f'{base}_{suffix}', suffix + 1
+        names.append(name)
+    values = [[] for _ in names]
+    for row in rows:
+        for k, column in enumerate(values):
+            column.append(row[k] if k < len(row) else None)
+    return {name: _typed_column(column) for name, column in zip(names, values)}
+
+
+def read_workbook(path):
+    """Разбирает книгу .xlsx или .ods без кеша: {лист: {столбец: массив}}."""
+    with zipfile.ZipFile(path) as archive:
+        if 'content.xml' in archive.namelist():
+            return {name: _columns(rows) for name, rows in _iter_ods_sheets(archive)}
+        strings = _shared_strings(archive)
+        date_styles = _date_styles(archive)
+        return {name: _columns(_iter_xlsx_rows(archive, member, strings, date_styles))
+                for name, member in _xlsx_sheets(archive)}
+
+
+def file_hash(path):
+    """sha256 содержимого файла."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _save_cache(directory, book):
+    """
+    Записывает книгу в directory через временную папку. Устаревший кеш (другая CACHE_VERSION,
+    испорченный meta.json) удаляется; при любой ошибке временная папка тоже удаляется.
+    """
+    tmp = directory + f'.tmp{os.getpid()}'
+    try:
+        os.makedirs(tmp, exist_ok=True)
+        meta = {'version': CACHE_VERSION, 'sheets': []}
+        for s, (sheet, columns) in enumerate(book.items()):
+            entry = {'name': sheet, 'columns': []}
+            for c, (name, column) in enumerate(columns.items()):
+                file = f'{s}_{c}.npy'
+                np.save(os.path.join(tmp, file), column)
+                entry['columns'].append([name, file])
+            meta['sheets'].append(entry)
+        with open(os.path.join(tmp, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+        if os.path.isdir(directory) and _open_cache(directory) is None:
+            shutil.rmtree(directory, ignore_errors=True)
+        os.replace(tmp, directory)
+    except OSError:
+        pass  # кеш уже записал параллельный процесс или папка недоступна — книга берется из памяти
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def _open_cache(directory):
+    """Книга из кеша или None, если кеша нет, он другой версии или испорчен."""
+    try:
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != CACHE_VERSION:
+            return None
+        return {entry['name']: {name: np.load(os.path.join(directory, file), mmap_mode='r')
+                                for name, file in entry['columns']}
+                for entry in meta['sheets']}
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+
+def load(path, cache=True):
+    """
+    Книга {лист: {столбец: массив}}. С cache=True разобранная книга берется из tests/.sheet_cache
+    (столбцы отображаются в память только для чтения) или сохраняется туда после первого разбора.
+    Повторные вызовы в том же процессе для неизменившегося файла возвращают те же массивы.
+    """
+    path = os.path.abspath(path)
+    if not cache:
+        return read_workbook(path)
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    if path in _loaded and _loaded[path][0] == signature:
+        return _loaded[path][2]
+
+    digest = file_hash(path)
+    directory = os.path.join(CACHE_DIR, digest)
+    book = _open_cache(directory)
+    if book is None:
+        book = read_workbook(path)
+        _save_cache(directory, book)
+        # Если кеш записать не удалось, возвращается только что разобранная книга
+        book = _open_cache(directory) or book
+    _loaded[path] = (signature, digest, book)
+    return book
+
+
+def where(table, mask):
+    """Строки таблицы {столбец: массив}, для которых mask истинна."""
+    return {name: column[mask] for name, column in table.items()}
+
+
+def join(left, right, on, right_on=None, suffix='_2'):
+    """
+    Соединение таблицы left со справочником right по ключу (многие к одному): к каждой строке left
+    добавляются столбцы строки right с тем же значением ключа; строки без пары отбрасываются.
+    Ключ справочника упорядочивается один раз, поиск пар — searchsorted по всем строкам сразу.
+    Столбцы right с уже занятыми именами получают суффикс suffix.
+    """
+    right_on = right_on or on
+    keys = np.asarray(right[right_on])
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    wanted = np.asarray(left[on])
+    position = np.searchsorted(sorted_keys, wanted)
+    position[position == sorted_keys.size] = 0
+    found = sorted_keys[position] == wanted if sorted_keys.size else np.zeros(wanted.shape, dtype=bool)
+    left_rows = np.flatnonzero(found)
+    right_rows = order[position[found]]
+
+    result = {name: column[left_rows] for name, column in left.items()}
+    for name, column in right.items():
+        if name == right_on and right_on == on:
+            continue
+        result[name + suffix if name in result else name] = column[right_rows]
+    return result
+
+
+def group_by(table, keys, value=None, func='sum'):
+    """
+    Группировка по столбцу (или списку столбцов) keys с агрегатом func над столбцом value:
+    'sum', 'count', 'mean', 'min', 'max'. Возвращает таблицу {ключи..., value: агрегаты},
+    группы упорядочены по возрастанию ключа.
+    """
+    keys = [keys] if isinstance(keys, str) else list(keys)
+    if len(keys) == 1:
+        groups, inverse = np.unique(np.asarray(table[keys[0]]), return_inverse=True)
+        result = {keys[0]: groups}
+    else:
+        records = np.rec.fromarrays([np.asarray(table[k]) for k in keys], names=[f'f{i}' for i in range(len(keys))])
+        groups, inverse = np.unique(records, return_inverse=True)
+        result = {k: groups[f'f{i}'] for i, k in enumerate(keys)}
+    inverse = inverse.ravel()
+    name = value or 'count'
+
+    if func == 'count':
+        result[name] = np.bincount(inverse, minlength=len(groups))
+        return result
+    values = np.asarray(table[value])
+    if func in ('sum', 'mean'):
+        totals = np.bincount(inverse, weights=values, minlength=len(groups))
+        if func == 'mean':
+            totals = totals / np.bincount(inverse, minlength=len(groups))
+        elif values.dtype.kind in 'iu':
+            totals = totals.astype(np.int64)
+        result[name] = totals
+    elif func in ('min', 'max'):
+        ufunc = np.minimum if func == 'min' else np.maximum
+        order = np.argsort(inverse, kind='stable')
+        starts = np.flatnonzero(np.diff(inverse[order], prepend=-1))
+        result[name] = ufunc.reduceat(values[order], starts) if values.size else values[:0]
+    else:
+        raise ValueError(f"Неизвестный агрегат: {func!r}")
+    return result
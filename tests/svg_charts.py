@@ -0,0 +1,184 @@
+"""
+Графики прогресса в SVG без matplotlib: разметка строится строками прямо из агрегированных
+данных (см. progress.common_percentages, progress.detailed_table). Цвета, легенда и подписи
+те же, что в charts.py; интерфейс тоже тот же (show_common_progress, detailed_progress_pages,
+save_figure), поэтому conftest выбирает модуль по PROGRESS_CHART_FORMAT и дальше не различает их.
+"""
+import math
+from xml.sax.saxutils import escape, quoteattr
+
+from .conftest import day_to_date
+from .progress import DETAILED_TABLE_DAYS, DETAILED_TABLE_PAGES, common_progress, detailed_pages, detailed_window
+
+# 100 точек на дюйм, как у matplotlib по умолчанию: размеры картинок совпадают с PNG
+DPI = 100
+FONT = 'DejaVu Sans, Arial, sans-serif'
+# Размеры шрифтов в пикселях (10 и 12 пунктов при 100 dpi)
+FONT_SIZE = 14
+TITLE_SIZE = 17
+CELL_FONT_SIZE = 11
+
+# Цвета ячеек детальной таблицы и легенды
+WRONG_COLOR = '#ffcccc'
+RIGHT_COLOR = '#ccffcc'
+# Градиент столбцов: red -> orange -> green, как LinearSegmentedColormap в charts.py
+BAR_GRADIENT = ((1.0, 0.0, 0.0), (1.0, 165 / 255, 0.0), (0.0, 128 / 255, 0.0))
+
+
+def save_figure(svg, path):
+    """Сохраняет SVG-документ в файл."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(svg)
+
+
+def bar_color(value, vmin=0, vmax=100):
+    """Цвет столбца для значения value: линейная интерполяция по BAR_GRADIENT."""
+    x = min(max((value - vmin) / (vmax - vmin), 0.0), 1.0) * (len(BAR_GRADIENT) - 1)
+    k = min(int(x), len(BAR_GRADIENT) - 2)
+    frac = x - k
+    rgb = [a + (b - a) * frac for a, b in zip(BAR_GRADIENT[k], BAR_GRADIENT[k + 1])]
+    return '#' + ''.join(f'{round(c * 255):02x}' for c in rgb)
+
+
+def _text(x, y, text, size=FONT_SIZE, anchor='middle', **attrs):
+    extra = ''.join(f' {name.replace("_", "-")}={quoteattr(str(value))}' for name, value in attrs.items())
+    return (f'<text x="{x:.1f}" y="{y:.1f}" font-size="{size}" text-anchor="{anchor}" '
+            f'dominant-baseline="central"{extra}>{escape(text)}</text>')
+
+
+def _document(width, height, body):
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}" font-family="{FONT}">\n'
+            f'<rect width="100%" height="100%" fill="white"/>\n'
+            + '\n'.join(body) + '\n</svg>\n')
+
+
+def _legend(right, top):
+    """Легенда 'Неверно'/'Верно' в правом верхнем углу области [.., right] x [top, ..]."""
+    width, height = 110, 52
+    x, y = right - width - 8, top + 8
+    body = [f'<rect x="{x}" y="{y}" width="{width}" height="{height}" rx="3" fill="white" '
+            f'fill-opacity="0.8" stroke="#cccccc"/>']
+    for k, (color, label) in enumerate(((WRONG_COLOR, 'Неверно'), (RIGHT_COLOR, 'Верно'))):
+        row = y + 8 + k * 20
+        body.append(f'<rect x="{x + 8}" y="{row}" width="28" height="14" fill="{color}"/>')
+        body.append(_text(x + 44, row + 7, label, anchor='start'))
+    return body
+
+
+def _no_data():
+    width, height = 12 * DPI, 5 * DPI
+    return _document(width, height, [_text(width / 2, height / 2, "Нет данных для отображения", size=19)])
+
+
+def show_detailed_progress_table(last_dates=DETAILED_TABLE_DAYS, date_from=None, date_to=None, columns=None):
+    """
+    Детальная таблица (см. charts.show_detailed_progress_table) в виде SVG-документа:
+    по горизонтали типы заданий, по вертикали даты (последние сверху), в ячейках — номера
+    заданий с '+'/'-' на фоне цвета среднего результата.
+    """
+    return detailed_figure(detailed_window(last_dates, date_from, date_to, columns))
+
+
+def detailed_figure(table):
+    """SVG детальной таблицы по данным progress.detailed_window (None — нет данных)."""
+    if table is None:
+        return _no_data()
+
+    days, sorted_types, table_data, cell_texts = table
+    width, height = 15 * DPI, max(5 * DPI, round(len(days) * 0.4 * DPI))
+    left, top, right, bottom = 110, 64, width - 20, height - 16
+    cell_w = (right - left) / len(sorted_types)
+    cell_h = (bottom - top) / len(days)
+
+    body = [_text((left + right) / 2, 18, "Детальный прогресс по заданиям", size=TITLE_SIZE)]
+    for j, task_type in enumerate(sorted_types):
+        body.append(_text(left + (j + 0.5) * cell_w, top - 14, str(task_type)))
+    for i, day in enumerate(days):
+        body.append(_text(left - 8, top + (i + 0.5) * cell_h, day_to_date(day).strftime('%Y-%m-%d'),
+                          anchor='end'))
+
+    # Фон ячеек: средний результат >= 0.5 — зеленый, иначе красный; без данных — белый.
+    # Белая обводка рисует сетку между ячейками
+    body.append('<g fill-opacity="0.7" stroke="white" stroke-width="2">')
+    for i, row in enumerate(table_data.tolist()):
+        for j, value in enumerate(row):
+            if math.isnan(value):
+                continue
+            color = RIGHT_COLOR if value >= 0.5 else WRONG_COLOR
+            body.append(f'<rect x="{left + j * cell_w:.1f}" y="{top + i * cell_h:.1f}" '
+                        f'width="{cell_w:.1f}" height="{cell_h:.1f}" fill="{color}"/>')
+    body.append('</g>')
+    body.append(f'<rect x="{left}" y="{top}" width="{right - left}" height="{bottom - top}" '
+                f'fill="none" stroke="black" stroke-width="0.8"/>')
+
+    # Подписи ячеек: строки сверху вниз, блок по центру ячейки
+    line_height = CELL_FONT_SIZE * 1.2
+    body.append(f'<g font-size="{CELL_FONT_SIZE}" text-anchor="middle" dominant-baseline="central">')
+    for (i, j), text in cell_texts.items():
+        lines = text.split("\n")
+        x = left + (j + 0.5) * cell_w
+        y = top + (i + 0.5) * cell_h - (len(lines) - 1) / 2 * line_height
+        for k, line in enumerate(lines):
+            body.append(f'<text x="{x:.1f}" y="{y + k * line_height:.1f}">{escape(line)}</text>')
+    body.append('</g>')
+
+    body.extend(_legend(right, top))
+    return _document(width, height, body)
+
+
+def detailed_progress_pages(days_per_page=DETAILED_TABLE_DAYS, pages=DETAILED_TABLE_PAGES, columns=None):
+    """Страницы детальной таблицы (см. progress.page_windows) — список SVG-документов."""
+    return [detailed_figure(table) for table in detailed_pages(days_per_page, pages, columns)]
+
+
+def show_common_progress(columns=None, solved=None):
+    """
+    Гистограмма общего прогресса (см. charts.show_common_progress) в виде SVG-документа.
+    columns и solved — уже загруженные ячейки (см. progress.chart_columns).
+    """
+    x_types = list(range(1, 28))  # 1..27
+    percentages = common_progress(x_types, columns, solved)
+    return progress_bars(x_types, percentages, 'Общий прогресс')
+
+
+def progress_bars(x_types, percentages, title):
+    """Гистограмма показателя успеваемости по темам (см. charts.progress_bars)."""
+    width, height = 12 * DPI, 5 * DPI
+    # Поля области графика — как subplotpars matplotlib по умолчанию
+    left, right = 0.125 * width, 0.9 * width
+    top, bottom = 0.12 * height, 0.89 * height
+    # Ось X: столбцы шириной 0.8 с полями 5%, как у ax.bar
+    lo, hi = min(x_types) - 0.4, max(x_types) + 0.4
+    margin = (hi - lo) * 0.05
+    lo, hi = lo - margin, hi + margin
+
+    def px(x):
+        return left + (x - lo) / (hi - lo) * (right - left)
+
+    def py(y):
+        return bottom - y / 100 * (bottom - top)
+
+    body = [_text((left + right) / 2, top - 20, title, size=TITLE_SIZE)]
+    for x, value in zip(x_types, percentages):
+        x0, x1 = px(x - 0.4), px(x + 0.4)
+        y = py(min(max(value, 0.0), 100.0))
+        body.append(f'<rect x="{x0:.1f}" y="{y:.1f}" width="{x1 - x0:.1f}" height="{bottom - y:.1f}" '
+                    f'fill="{bar_color(value)}"/>')
+        body.append(_text((x0 + x1) / 2, (y + bottom) / 2, f"{value:.1f}", size=CELL_FONT_SIZE + 2))
+
+    # Оси, деления и подписи
+    body.append(f'<rect x="{left:.1f}" y="{top:.1f}" width="{right - left:.1f}" height="{bottom - top:.1f}" '
+                f'fill="none" stroke="black" stroke-width="0.8"/>')
+    for x in x_types:
+        body.append(f'<line x1="{px(x):.1f}" y1="{bottom:.1f}" x2="{px(x):.1f}" y2="{bottom + 4:.1f}" '
+                    f'stroke="black"/>')
+        body.append(_text(px(x), bottom + 14, str(x)))
+    for y in range(0, 101, 20):
+        body.append(f'<line x1="{left - 4:.1f}" y1="{py(y):.1f}" x2="{left:.1f}" y2="{py(y):.1f}" '
+                    f'stroke="black"/>')
+        body.append(_text(left - 8, py(y), str(y), anchor='end'))
+    body.append(_text((left + right) / 2, bottom + 38, 'Номер темы'))
+    body.append(_text(left - 48, (top + bottom) / 2, 'Показатель успеваемости',
+                      transform=f'rotate(-90 {left - 48:.1f} {(top + bottom) / 2:.1f})'))
+    return _document(width, height, body)
@@ -0,0 +1,263 @@
+"""
+Решатель заданий Темы 2 ЕГЭ: таблица истинности выражения и сопоставление фрагмента со столбцами.
+
+    from tests.truth_table import solve
+    solve('(¬z ≡ y) → ((w ∧ ¬x) ≡ (y ∧ x))', ['?1110', '11??0', '??0?0'])   # ['zwxy']
+    truth_table(['¬1 ∨ x', '¬0 ≡ x'])[2].tolist()   # [[False, False], [True, True]]
+
+Выражение записывается знаками ЕГЭ (¬ ∧ ∨ → ≡, а также ⊕) или их текстовыми заменами
+(not/and/or, ->, ==). Приоритет, от высшего: ¬, ∧, ∨, →, затем ≡ и ⊕; операции одного
+приоритета выполняются слева направо. Выражение разбирается один раз и вычисляется сразу
+на всех 2^n наборах как массивы NumPy.
+
+Фрагмент — строки из '0', '1' и пропусков ('?', '_' или '.'): сначала столбцы переменных,
+затем значения функций (по одному на выражение). Пробелы внутри строки игнорируются.
+Столбцы переменных перебираются с отсечением: строки таблицы хранятся битовыми масками,
+и как только для какой-нибудь строки фрагмента не остается подходящей строки таблицы,
+ветка перебора закрывается. Поэтому 6–8 переменных и большие фрагменты решаются мгновенно.
+"""
+import re
+
+import numpy as np
+
+# Текстовые формы операций -> имя операции
+OPERATORS = {
+    '¬': 'not', '!': 'not', '~': 'not', 'not': 'not',
+    '∧': 'and', '&': 'and', 'and': 'and',
+    '∨': 'or', '|': 'or', 'or': 'or',
+    '→': 'impl', '->': 'impl', '=>': 'impl', '⇒': 'impl',
+    '≡': 'eq', '==': 'eq', '=': 'eq', '↔': 'eq', '<->': 'eq', '⇔': 'eq',
+    '⊕': 'xor', '^': 'xor', 'xor': 'xor',
+}
+
+# Уровни бинарных операций от низшего приоритета к высшему
+BINARY_LEVELS = (('eq', 'xor'), ('impl',), ('or',), ('and',))
+
+_TOKEN_RE = re.compile(r'\s*(?:([A-Za-z_]\w*)|([01])|([()])|('
+                       + '|'.join(re.escape(op) for op in sorted(OPERATORS, key=len, reverse=True)
+                                  if not op.isalpha())
+                       + r'))')
+
+# Пропуск в строке фрагмента
+BLANKS = '?_.'
+
+
+def tokenize(expression):
+    """Список лексем: ('var', имя), ('const', 0/1), ('(', None), (')', None), ('op', имя операции)."""
+    tokens, pos = [], 0
+    expression = expression.rstrip()
+    while pos < len(expression):
+        match = _TOKEN_RE.match(expression, pos)
+        if not match:
+            raise ValueError(f"Непонятный символ в выражении: {expression[pos:].strip()[:10]!r}")
+        name, const, paren, op = match.groups()
+        if name is not None:
+            tokens.append(('op', OPERATORS[name]) if name in OPERATORS else ('var', name))
+        elif const is not None:
+            tokens.append(('const', int(const)))
+        elif paren is not None:
+            tokens.append((paren, None))
+        else:
+            tokens.append(('op', OPERATORS[op]))
+        pos = match.end()
+    return tokens
+
+
+def parse(expression):
+    """
+    Дерево выражения из кортежей: ('var', имя), ('const', 0/1), ('not', a), (операция, a, b).
+    """
+    tokens = tokenize(expression)
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else (None, None)
+
+    def binary(level):
+        nonlocal pos
+        if level == len(BINARY_LEVELS):
+            return unary()
+        left = binary(level + 1)
+        while peek()[0] == 'op' and peek()[1] in BINARY_LEVELS[level]:
+            op = peek()[1]
+            pos += 1
+            left = (op, left, binary(level + 1))
+        return left
+
+    def unary():
+        nonlocal pos
+        kind, value = peek()
+        pos += 1
+        if kind == 'op' and value == 'not':
+            return ('not', unary())
+        if kind in ('var', 'const'):
+            return (kind, value)
+        if kind == '(':
+            node = binary(0)
+            if peek()[0] != ')':
+                raise ValueError(f"Не закрыта скобка в выражении {expression!r}")
+            pos += 1
+            return node
+        raise ValueError(f"Ожидался операнд в выражении {expression!r}")
+
+    tree = binary(0)
+    if pos != len(tokens):
+        raise ValueError(f"Лишние символы в выражении {expression!r}")
+    return tree
+
+
+def variables_of(tree):
+    """Имена переменных выражения в алфавитном порядке."""
+    if tree[0] == 'var':
+        return [tree[1]]
+    if tree[0] == 'const':
+        return []
+    return sorted(set().union(*(variables_of(child) for child in tree[1:])))
+
+
+def evaluate(tree, env):
+    """Значение выражения; env — {имя: массив bool}, операции выполняются над массивами целиком."""
+    kind = tree[0]
+    if kind == 'var':
+        return env[tree[1]]
+    if kind == 'const':
+        # Скаляр NumPy, а не bool: ~True у bool — это -2, а не False
+        return np.bool_(tree[1])
+    if kind == 'not':
+        return ~evaluate(tree[1], env)
+    a, b = evaluate(tree[1], env), evaluate(tree[2], env)
+    if kind == 'and':
+        return a & b
+    if kind == 'or':
+        return a | b
+    if kind == 'impl':
+        return ~a | b
+    if kind == 'eq':
+        return a == b
+    return a ^ b  # xor
+
+
+def truth_table(expressions, variables=None):
+    """
+    Таблица истинности одного или нескольких выражений (строки или деревья parse).
+    Возвращает (variables, наборы — bool-массив 2^n x n, значения — bool-массив 2^n x m).
+    Наборы идут в порядке вложенных циклов: 00..0, 00..1, ...; variables по умолчанию — по алфавиту.
+    """
+    if isinstance(expressions, (str, tuple)):
+        expressions = [expressions]
+    trees = [parse(e) if isinstance(e, str) else e for e in expressions]
+    if variables is None:
+        variables = sorted(set().union(*(variables_of(tree) for tree in trees)))
+    variables = list(variables)
+    n = len(variables)
+    index = np.arange(1 << n, dtype=np.int64)
+    assignments = ((index[:, None] >> np.arange(n - 1, -1, -1)) & 1).astype(bool)
+    env = {name: assignments[:, k] for k, name in enumerate(variables)}
+    values = np.empty((1 << n, len(trees)), dtype=bool)
+    for k, tree in enumerate(trees):
+        values[:, k] = evaluate(tree, env)
+    return variables, assignments, values
+
+
+def parse_fragment(rows):
+    """Строки фрагмента -> список кортежей из 0, 1 и None (пропуск). Строки могут быть и кортежами."""
+    fragment = []
+    for row in rows:
+        if isinstance(row, str):
+            row = [ch for ch in row if not ch.isspace()]
+        fragment.append(tuple(None if cell is None or cell in BLANKS else int(cell) for cell in row))
+    return fragment
+
+
+def _bits(mask):
+    """bool-массив -> битовая маска int (бит i — строка i таблицы)."""
+    return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+
+def _distinct_rows(candidates):
+    """
+    Можно ли сопоставить строкам фрагмента попарно разные строки таблицы
+    (фрагмент состоит из неповторяющихся строк). Паросочетание Куна на битовых масках.
+    """
+    if all(bin(mask).count('1') >= len(candidates) for mask in candidates):
+        return True
+    owner = {}  # строка таблицы -> строка фрагмента
+
+    def augment(i, visited):
+        mask = candidates[i]
+        while mask:
+            low = mask & -mask
+            mask ^= low
+            row = low.bit_length() - 1
+            if row in visited:
+                continue
+            visited.add(row)
+            if row not in owner or augment(owner[row], visited):
+                owner[row] = i
+                return True
+        return False
+
+    return all(augment(i, set()) for i in range(len(candidates)))
+
+
+def match_fragment(expressions, fragment, variables=None):
+    """
+    Все способы расставить переменные по столбцам фрагмента так, чтобы каждая его строка
+    совпала со своей (отдельной) строкой таблицы истинности. Возвращает список кортежей
+    имен переменных в порядке столбцов.
+    """
+    if isinstance(expressions, (str, tuple)):
+        expressions = [expressions]
+    variables, assignments, values = truth_table(expressions, variables)
+    n, m = len(variables), values.shape[1]
+    rows = parse_fragment(fragment)
+    for row in rows:
+        if len(row) != n + m:
+            raise ValueError(f"В строке фрагмента {len(row)} ячеек, ожидалось {n + m} "
+                             f"({n} переменных и {m} функций)")
+
+    # var_masks[v][b] — строки таблицы, где переменная v равна b
+    var_masks = [(_bits(~assignments[:, v]), _bits(assignments[:, v])) for v in range(n)]
+    # Начальные кандидаты строки фрагмента — строки таблицы с теми же значениями функций
+    candidates = []
+    for row in rows:
+        mask = (1 << len(values)) - 1
+        for k, cell in enumerate(row[n:]):
+            if cell is not None:
+                mask &= _bits(values[:, k] if cell else ~values[:, k])
+        candidates.append(mask)
+    if not all(candidates):
+        return []
+
+    # Сначала самые заполненные столбцы: отсечение срабатывает раньше
+    order = sorted(range(n), key=lambda j: -sum(row[j] is not None for row in rows))
+    column_vars = [None] * n
+    solutions = []
+
+    def search(depth, candidates, used):
+        if depth == n:
+            if _distinct_rows(candidates):
+                solutions.append(tuple(variables[v] for v in column_vars))
+            return
+        j = order[depth]
+        for v in range(n):
+            if used >> v & 1:
+                continue
+            narrowed = []
+            for row, mask in zip(rows, candidates):
+                if row[j] is not None:
+                    mask &= var_masks[v][row[j]]
+                    if not mask:
+                        break
+                narrowed.append(mask)
+            else:
+                column_vars[j] = v
+                search(depth + 1, narrowed, used | 1 << v)
+
+    search(0, candidates, 0)
+    return sorted(solutions)
+
+
+def solve(expressions, fragment, variables=None):
+    """Ответы в формате ЕГЭ: буквы переменных в порядке столбцов, например ['zwxy']."""
+    return [''.join(names) for names in match_fragment(expressions, fragment, variables)]
@@ -0,0 +1,87 @@
+"""
+Режим наблюдения: перепроверка task-скриптов при сохранении.
+
+    python -m tests.watch            # все темы
+    python -m tests.watch 7 11       # только темы 7 и 11
+
+Процесс работает постоянно: NumPy, модуль графиков и соединение с БД загружаются один раз.
+Папки "Тема */Задания" опрашиваются по mtime; измененный скрипт выполняется в этом же
+процессе, когда его mtime перестает меняться (debounce). Все скрипты, сохраненные за одно
+окно, регистрируются одной пачкой (см. registration_batch): одна отрисовка и один коммит.
+"""
+import argparse
+import os
+import sys
+import time
+
+from tests.conftest import chart_backend, get_connection, registration_batch
+from tests.grader import discover_task_scripts, run_task_script
+
+# Период опроса и время, в течение которого файл не должен меняться, прежде чем его проверить
+POLL_SECONDS = 0.2
+DEBOUNCE_SECONDS = 0.3
+
+
+def snapshot(types=None):
+    """{(тип, номер): (путь, mtime)} для всех task-скриптов."""
+    state = {}
+    for t, number, path in discover_task_scripts(types):
+        try:
+            state[(t, number)] = (path, os.stat(path).st_mtime_ns)
+        except FileNotFoundError:
+            pass  # файл переименовали между сканированием и stat — увидим на следующем опросе
+    return state
+
+
+def watch(types=None, poll=POLL_SECONDS, debounce=DEBOUNCE_SECONDS):
+    # Прогреваем все, что нужно для регистрации и графиков
+    get_connection()
+    chart_backend()
+
+    known = snapshot(types)
+    changed = {}  # (тип, номер) -> время последнего замеченного изменения
+    print(f"Наблюдение за {len(known)} заданиями. Ctrl+C — выход.")
+    while True:
+        time.sleep(poll)
+        current = snapshot(types)
+        now = time.monotonic()
+        for key, (path, mtime) in current.items():
+            # Ключ — тип и номер, а не путь: переименование '+'/'-' с тем же mtime изменением не считается
+            if key not in known or known[key][1] != mtime:
+                changed[key] = now
+        known = current
+
+        ready = [key for key, seen in changed.items() if now - seen >= debounce and key in current]
+        if not ready:
+            continue
+        for key in ready:
+            del changed[key]
+
+        started = time.perf_counter()
+        with registration_batch():
+            for t, number in sorted(ready):
+                # Вердикт печатает сам скрипт (print(result_register(...)))
+                print(f"Тема {t}, задание {number}:")
+                error = run_task_script(current[(t, number)][0])
+                if error:
+                    print(f"Ошибка: {error}")
+        print(f"  ({(time.perf_counter() - started) * 1000:.0f} мс)")
+        # Регистрация переименовала файлы — запоминаем новые пути
+        known = snapshot(types)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Перепроверка task-скриптов при сохранении")
+    parser.add_argument('types', nargs='*', type=int, help="номера тем (по умолчанию все)")
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS, help="период опроса, с")
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS, help="пауза после сохранения, с")
+    args = parser.parse_args(argv)
+    try:
+        watch(args.types or None, args.poll, args.debounce)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())